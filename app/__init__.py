@@ -1 +1,11 @@
 # App package
+#
+# 包导入时把项目根目录加入 sys.path (只执行一次)，
+# 供 app 下各模块直接导入 scripts.* 模块，无需各自修改 sys.path
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
@@ -0,0 +1,43 @@
+"""
+Celery 应用 (分布式任务队列)
+
+音频生成流水线和角色录音的声音克隆是 GPU 密集型任务 (需要 AI 推理)，
+由独立的 Celery worker 进程执行，API 进程只负责投递任务:
+- API 进程不再被流水线占用，请求处理延迟与队列深度解耦
+- 任务保存在 Redis 中，API 进程重启不会丢失排队中的任务
+- worker 可以多进程 / 多机器横向扩展
+
+启动 worker (每块 GPU 一个进程):
+    celery -A app.celery_app worker -c 1 --pool=solo
+"""
+
+import os
+
+from celery import Celery
+
+# Redis 地址，可通过环境变量覆盖
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+celery_app = Celery(
+    "tts",
+    broker=REDIS_URL,
+    # 结果后端: 仅声音克隆任务保存结果 (API 网关等待克隆音频路径)
+    backend=REDIS_URL,
+    include=["app.services.audio_pipeline", "app.services.voice_clone"],
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    # 默认不保存任务结果 (流水线状态写在 TaskManager 中)，需要结果的任务单独开启
+    task_ignore_result=True,
+    # 已保存的结果 1 小时后过期
+    result_expires=60 * 60,
+    # 任务执行完成后才确认，worker 崩溃时任务会重新投递
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # 流水线耗时很长，每个 worker 一次只领取一个任务
+    worker_prefetch_multiplier=1,
+    # 确认超时需大于单个流水线的最长耗时，避免任务被重复投递
+    broker_transport_options={"visibility_timeout": 6 * 60 * 60},
+)
@@ -5,19 +5,26 @@ FastAPI 主应用
 - POST /api/generate - 创建新任务
 - GET /api/task/{task_id} - 查询任务状态
 - GET /api/tasks - 列出所有任务
+
+注意: 音频生成流水线是 GPU 密集型任务 (语音克隆需要 AI 推理)，
+不能通过 fastapi.BackgroundTasks 调度 —— 它在处理请求的 worker 进程中执行，
+会占用事件循环、拖慢其他请求。流水线必须投递到 audio_pipeline.py 中定义的
+Celery 任务，由独立的 worker 进程执行。
 """
 
 import os
 import uuid
+import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor
-from typing import List
-
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+import logging.handlers
+from pathlib import Path
+from queue import SimpleQueue
+from typing import List, Optional
+
+import orjson
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-
 from app.models import (
     GenerateAudioRequest,
     GenerateByIdsRequest,
@@ -26,25 +33,46 @@ from app.models import (
     TaskListResponse,
     TaskStatus,
 )
-from app.services.task_manager import task_manager
-from app.services.audio_pipeline import generate_audio_pipeline
-from app.services.business_generate import business_generate_service
+from app.services.task_manager import task_manager, MAX_QUERY_LIMIT
+from app.services.audio_pipeline import submit_pipeline
+from app.services.business_generate import get_service
 
 # ============================================================================
 # 日志配置
 # ============================================================================
 
+# 请求处理中只把日志记录放入内存队列，由 QueueListener 后台线程负责写控制台和文件，
+# 避免同步的文件写入阻塞请求处理
+_log_queue = SimpleQueue()
+
+# force=True: scripts 模块导入时已调用 basicConfig，这里替换掉它们添加的处理器
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("app.log", encoding="utf-8"),
-    ],
+    format="%(message)s",  # 完整格式由 QueueListener 中的处理器负责
+    handlers=[logging.handlers.QueueHandler(_log_queue)],
+    force=True,
+)
+
+_log_formatter = logging.Formatter(
+    "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(_log_formatter)
+# 按大小滚动，避免日志文件无限增长
+_file_handler = logging.handlers.RotatingFileHandler(
+    "app.log", maxBytes=50 * 1024 * 1024, backupCount=5, encoding="utf-8"
+)
+_file_handler.setFormatter(_log_formatter)
+
+log_listener = logging.handlers.QueueListener(
+    _log_queue, _stream_handler, _file_handler, respect_handler_level=True
 )
 
 logger = logging.getLogger(__name__)
 
+# 启动日志中的分隔线
+_BANNER = "=" * 70
+
 # ============================================================================
 # FastAPI 应用初始化
 # ============================================================================
@@ -53,6 +81,7 @@ app = FastAPI(
     title="TTS Story Audio Generation API",
     description="音频生成流水线 API - 支持语音克隆、去静音、序列构建和对齐合成",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # 对外基础地址（用于生成可访问的音频URL），可通过环境变量覆盖
@@ -67,25 +96,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 线程池执行器 (用于后台任务)
-executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="audio_pipeline_")
-
-# 静态资源挂载：暴露生成任务输出目录，供前端播放音频
-app.mount(
-    "/media",
-    StaticFiles(directory="data/tasks", check_dir=False),
-    name="media",
-)
+# 静态资源：生成任务输出目录，供前端播放音频
+MEDIA_ROOT = Path("data/tasks").resolve()
 
-# ============================================================================
-# API 端点
-# ============================================================================
+# 配置后由 nginx 通过 X-Accel-Redirect 直接发送文件 (sendfile)，不经过 Python
+# 值为 nginx 中 internal location 的路径前缀，例如 /_media (参见 config/nginx.conf.example)
+MEDIA_ACCEL_PREFIX = os.getenv("MEDIA_ACCEL_PREFIX", "").rstrip("/")
 
+# 任务输出文件按 task_id 存放，生成后不再变化，允许客户端长期缓存
+MEDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
-@app.get("/")
-async def root():
-    """根路径 - API信息"""
-    return {
+# 固定内容的响应体 (模块加载时序列化一次，负载均衡器频繁探测 /health 时无需重复序列化)
+_ROOT_BODY = orjson.dumps(
+    {
         "name": "TTS Story Audio Generation API",
         "version": "1.0.0",
         "status": "running",
@@ -96,12 +119,36 @@ async def root():
             "GET /api/tasks": "列出所有任务",
         },
     }
+)
+_HEALTH_BODY = orjson.dumps({"status": "healthy", "message": "Service is running"})
+
+# ============================================================================
+# 辅助函数
+# ============================================================================
+
+
+def _task_message(status: TaskStatus) -> str:
+    """任务创建响应消息"""
+    if status == TaskStatus.COMPLETED:
+        return "任务已完成 (复用相同输入的生成结果)"
+    return "任务已创建，正在后台执行"
+
+
+# ============================================================================
+# API 端点
+# ============================================================================
+
+
+@app.get("/")
+async def root():
+    """根路径 - API信息"""
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health")
 async def health_check():
     """健康检查"""
-    return {"status": "healthy", "message": "Service is running"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 @app.post("/api/generate", response_model=TaskResponse)
@@ -109,7 +156,7 @@ async def create_generate_task(request: GenerateAudioRequest):
     """
     创建音频生成任务
 
-    接收请求参数，创建任务，在后台执行pipeline，立即返回task_id
+    接收请求参数，创建任务，将pipeline投递到Celery队列，立即返回task_id
 
     Args:
         request: 音频生成请求参数
@@ -122,7 +169,8 @@ async def create_generate_task(request: GenerateAudioRequest):
         task_id = str(uuid.uuid4())
 
         # 创建任务记录
-        task = task_manager.create_task(
+        task = await asyncio.to_thread(
+            task_manager.create_task,
             task_id=task_id,
             task_name=request.task_name,
             total_steps=4,
@@ -131,20 +179,20 @@ async def create_generate_task(request: GenerateAudioRequest):
         # 将请求参数转为字典
         params = request.model_dump()
 
-        # 提交到线程池后台执行
-        executor.submit(generate_audio_pipeline, task_id, params)
+        # 命中结果缓存时直接完成，否则投递到 Celery 队列 (文件哈希在线程中执行)
+        status = await asyncio.to_thread(submit_pipeline, task_id, params)
 
-        logger.info(f"✅ 任务已提交: {task_id}")
+        logger.info("✅ 任务已提交: %s", task_id)
 
         return TaskResponse(
             task_id=task_id,
-            status=TaskStatus.PENDING,
-            message="任务已创建，正在后台执行",
+            status=status,
+            message=_task_message(status),
             created_at=task["created_at"],
         )
 
     except Exception as e:
-        logger.error(f"❌ 创建任务失败: {str(e)}")
+        logger.error("❌ 创建任务失败: %s", e)
         raise HTTPException(status_code=500, detail=f"创建任务失败: {str(e)}")
 
 
@@ -164,44 +212,48 @@ async def create_generate_task_by_ids(request: GenerateByIdsRequest):
     """
     try:
         logger.info(
-            f"收到ID生成请求: story_id={request.story_id}, "
-            f"user_id={request.user_id}, role_id={request.role_id}"
+            "收到ID生成请求: story_id=%s, user_id=%s, role_id=%s",
+            request.story_id,
+            request.user_id,
+            request.role_id,
         )
 
-        # 1. 准备生成参数 (配置文件读取 + 数据库查询)
+        # 1. 准备生成参数 (配置文件读取 + 数据库查询，放到线程中执行以免阻塞事件循环)
         try:
-            params = business_generate_service.prepare_generation_params(
+            params = await asyncio.to_thread(
+                get_service().prepare_generation_params,
                 story_id=request.story_id,
                 user_id=request.user_id,
                 role_id=request.role_id,
                 task_name=request.task_name,
             )
         except FileNotFoundError as e:
-            logger.error(f"配置文件不存在: {str(e)}")
+            logger.error("配置文件不存在: %s", e)
             raise HTTPException(status_code=404, detail=str(e))
         except ValueError as e:
-            logger.error(f"参数错误: {str(e)}")
+            logger.error("参数错误: %s", e)
             raise HTTPException(status_code=400, detail=str(e))
 
         # 2. 生成唯一任务ID
         task_id = str(uuid.uuid4())
 
         # 3. 创建任务记录
-        task = task_manager.create_task(
+        task = await asyncio.to_thread(
+            task_manager.create_task,
             task_id=task_id,
             task_name=params.get("task_name", f"故事{request.story_id}生成"),
             total_steps=4,
         )
 
-        # 4. 提交到线程池后台执行
-        executor.submit(generate_audio_pipeline, task_id, params)
+        # 4. 命中结果缓存时直接完成，否则投递到 Celery 队列
+        status = await asyncio.to_thread(submit_pipeline, task_id, params)
 
-        logger.info(f"✅ ID生成任务已提交: {task_id}")
+        logger.info("✅ ID生成任务已提交: %s", task_id)
 
         return TaskResponse(
             task_id=task_id,
-            status=TaskStatus.PENDING,
-            message="任务已创建，正在后台执行",
+            status=status,
+            message=_task_message(status),
             created_at=task["created_at"],
         )
 
@@ -209,7 +261,7 @@ async def create_generate_task_by_ids(request: GenerateByIdsRequest):
         # HTTPException需要重新抛出
         raise
     except Exception as e:
-        logger.error(f"❌ 创建ID生成任务失败: {str(e)}")
+        logger.error("❌ 创建ID生成任务失败: %s", e)
         raise HTTPException(status_code=500, detail=f"创建任务失败: {str(e)}")
 
 
@@ -224,57 +276,80 @@ async def get_task_status(task_id: str):
     Returns:
         任务状态详情
     """
-    task = task_manager.get_task(task_id)
+    task_json = await asyncio.to_thread(task_manager.get_task_json, task_id)
 
-    if task is None:
+    if task_json is None:
         raise HTTPException(status_code=404, detail=f"任务不存在: {task_id}")
 
-    # 将字典转为 Pydantic 模型
-    try:
-        return TaskStatusResponse(**task)
-    except Exception as e:
-        logger.error(f"❌ 返回任务状态失败: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"返回任务状态失败: {str(e)}")
+    # 任务 JSON 在每次变更时已序列化，直接返回，跳过 Pydantic 校验
+    return Response(content=task_json, media_type="application/json")
+
+
+@app.get("/media/{task_id}/{file_path:path}")
+async def get_media_file(task_id: str, file_path: str):
+    """
+    获取任务输出文件 (音频)
+
+    配置了 MEDIA_ACCEL_PREFIX 时只返回 X-Accel-Redirect 响应头，
+    文件内容由 nginx 通过 sendfile 直接发送；否则由应用返回 FileResponse
+
+    Args:
+        task_id: 任务ID
+        file_path: 任务目录下的相对路径
+
+    Returns:
+        文件内容或 X-Accel-Redirect 响应
+    """
+    path = (MEDIA_ROOT / task_id / file_path).resolve()
+
+    # 防止路径穿越 (../) 访问任务目录之外的文件
+    if MEDIA_ROOT not in path.parents:
+        raise HTTPException(status_code=404, detail="文件不存在")
+    if not await asyncio.to_thread(path.is_file):
+        raise HTTPException(status_code=404, detail="文件不存在")
+
+    headers = {"Cache-Control": MEDIA_CACHE_CONTROL}
+
+    if MEDIA_ACCEL_PREFIX:
+        relative_path = path.relative_to(MEDIA_ROOT).as_posix()
+        headers["X-Accel-Redirect"] = f"{MEDIA_ACCEL_PREFIX}/{relative_path}"
+        return Response(headers=headers)
+
+    return FileResponse(path, headers=headers)
 
 
 @app.get("/api/tasks", response_model=TaskListResponse)
 async def list_all_tasks(
-    limit: int = 100,
-    status: str = None,
+    limit: int = Query(100, ge=1, le=MAX_QUERY_LIMIT),
+    status: Optional[str] = None,
 ):
     """
     列出所有任务
 
     Args:
-        limit: 返回数量限制
-        status: 按状态筛选 (可选)
+        limit: 返回数量限制 (1 ~ MAX_QUERY_LIMIT)
+        status: 按状态筛选 (可选，未知状态返回空列表)
 
     Returns:
         任务列表
     """
     try:
-        all_tasks = task_manager.get_all_tasks()
-
-        # 按状态筛选
-        if status:
-            all_tasks = [t for t in all_tasks if t.get("status") == status]
-
-        # 按创建时间倒序排序
-        all_tasks.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-
-        # 限制返回数量
-        all_tasks = all_tasks[:limit]
-
-        # 转为 Pydantic 模型
-        task_list = [TaskStatusResponse(**task) for task in all_tasks]
+        # 筛选、排序、截取均在存储层完成
+        tasks = await asyncio.to_thread(
+            task_manager.query_tasks,
+            status=status,
+            limit=limit,
+        )
 
-        return TaskListResponse(
-            total=len(task_list),
-            tasks=task_list,
+        # 任务数据来自本服务的存储，结构与 TaskStatusResponse 一致，
+        # 直接序列化返回，跳过 Pydantic 校验 (response_model 仅用于接口文档)
+        return Response(
+            content=orjson.dumps({"total": len(tasks), "tasks": tasks}, default=str),
+            media_type="application/json",
         )
 
     except Exception as e:
-        logger.error(f"❌ 获取任务列表失败: {str(e)}")
+        logger.error("❌ 获取任务列表失败: %s", e)
         raise HTTPException(status_code=500, detail=f"获取任务列表失败: {str(e)}")
 
 
@@ -289,16 +364,16 @@ async def delete_task(task_id: str):
     Returns:
         删除结果
     """
-    task = task_manager.get_task(task_id)
+    task = await asyncio.to_thread(task_manager.get_task, task_id)
 
     if task is None:
         raise HTTPException(status_code=404, detail=f"任务不存在: {task_id}")
 
     try:
-        task_manager.delete_task(task_id)
+        await asyncio.to_thread(task_manager.delete_task, task_id)
         return {"message": f"任务已删除: {task_id}"}
     except Exception as e:
-        logger.error(f"❌ 删除任务失败: {str(e)}")
+        logger.error("❌ 删除任务失败: %s", e)
         raise HTTPException(status_code=500, detail=f"删除任务失败: {str(e)}")
 
 
@@ -310,21 +385,23 @@ async def delete_task(task_id: str):
 @app.on_event("startup")
 async def startup_event():
     """应用启动事件"""
-    logger.info("=" * 70)
+    log_listener.start()
+
+    logger.info(_BANNER)
     logger.info("🚀 TTS Story Audio Generation API 启动中...")
-    logger.info("=" * 70)
-    logger.info(f"📂 任务管理器已初始化")
-    logger.info(f"🔧 线程池已就绪 (max_workers=5)")
-    logger.info(f"🎯 GPU 并发限制: 1 (同时最多1个任务执行AI推理)")
-    logger.info("=" * 70)
+    logger.info(_BANNER)
+    logger.info("📂 任务管理器已初始化")
+    logger.info("🔧 流水线任务将投递到 Celery 队列 (由 worker 进程执行)")
+    logger.info(_BANNER)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """应用关闭事件"""
     logger.info("👋 服务正在关闭...")
-    executor.shutdown(wait=True)
-    logger.info("✅ 线程池已停止")
+
+    # 写出队列中剩余的日志并停止后台线程
+    log_listener.stop()
 
 
 # ============================================================================
@@ -335,7 +412,7 @@ async def shutdown_event():
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """全局异常处理"""
-    logger.error(f"❌ 未处理的异常: {str(exc)}", exc_info=True)
+    logger.error("❌ 未处理的异常: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=500,
         content={
@@ -350,6 +427,7 @@ async def global_exception_handler(request, exc):
 # ============================================================================
 
 if __name__ == "__main__":
+    # 仅用于本地开发 (单进程)，生产环境使用 scripts/serve.sh 启动多 worker
     import uvicorn
 
     uvicorn.run(
@@ -358,4 +436,6 @@ if __name__ == "__main__":
         port=8000,
         reload=True,  # 开发模式，生产环境设为 False
         log_level="info",
+        loop="uvloop",
+        http="httptools",
     )
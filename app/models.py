@@ -5,7 +5,7 @@ Pydantic 数据模型定义
 """
 
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from enum import Enum
 
@@ -40,8 +40,10 @@ class GenerateAudioRequest(BaseModel):
     # 可选参数
     task_name: Optional[str] = Field(None, description="任务名称")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "input_wav": "/path/to/speaker.wav",
                 "json_db": "/path/to/tasks.json",
@@ -51,7 +53,8 @@ class GenerateAudioRequest(BaseModel):
                 "bgm_path": "/path/to/bgm.wav",
                 "task_name": "Episode 1 Generation",
             }
-        }
+        },
+    )
 
 
 class TaskResponse(BaseModel):
@@ -113,12 +116,15 @@ class GenerateByIdsRequest(BaseModel):
     role_id: int = Field(..., description="角色ID (角色/声音ID)")
     task_name: Optional[str] = Field(None, description="任务名称 (可选)")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "story_id": 1,
                 "user_id": 101,
                 "role_id": 5,
                 "task_name": "第一集生成",
             }
-        }
+        },
+    )
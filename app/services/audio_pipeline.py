@@ -8,32 +8,34 @@
 4. Alignment (对齐合成)
 
 特性:
+- 作为 Celery 任务在独立的 worker 进程中执行
 - 基于task_id创建独立工作目录
-- 使用Semaphore控制GPU并发 (最多1个任务同时执行AI推理)
+- 使用 Redis 信号量控制GPU并发 (所有 worker 共享，默认最多1个任务同时执行AI推理)
+- 生成结果按输入内容哈希缓存，相同输入的后续请求直接复用
 - 详细的错误处理和状态追踪
 """
 
 import os
-import sys
 import logging
-import threading
 from pathlib import Path
-from typing import Dict, Any
-
-# 添加项目根目录到路径 (用于导入scripts模块)
-project_root = Path(__file__).parent.parent.parent
-if str(project_root) not in sys.path:
-    sys.path.insert(0, str(project_root))
+from typing import Dict, Any, List
 
 # 导入重构后的脚本函数
-from scripts.auto_voice_cloner import run_voice_cloning  # noqa: E402
-from scripts.trim_silence_tool import run_trim_silence  # noqa: E402
-from scripts.build_story_sequence import run_build_sequence  # noqa: E402
-from scripts.align import run_alignment  # noqa: E402
-from scripts.user_story_book_dao import UserStoryBookDAO  # noqa: E402
-
-from app.services.task_manager import task_manager  # noqa: E402
-from app.models import TaskStatus  # noqa: E402
+from scripts.auto_voice_cloner import run_voice_cloning
+from scripts.trim_silence_tool import run_trim_silence
+from scripts.build_story_sequence import run_build_sequence
+from scripts.align import run_alignment
+
+from app.celery_app import celery_app
+from app.services import result_cache
+from app.services.story_book_writer import get_user_story_book_writer
+from app.services.gpu_semaphore import (
+    RedisSemaphore,
+    GPU_SEMAPHORE_KEY,
+    GPU_CONCURRENCY,
+)
+from app.services.task_manager import task_manager
+from app.models import TaskStatus
 
 logger = logging.getLogger(__name__)
 
@@ -41,11 +43,97 @@ logger = logging.getLogger(__name__)
 PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "").rstrip("/")
 
 # ============================================================================
-# GPU 并发控制 (全局 Semaphore)
+# 辅助函数
 # ============================================================================
 
-# 限制同时只有1个任务在执行AI推理 (防止GPU显存溢出)
-gpu_semaphore = threading.Semaphore(1)
+
+def _resolve_audio_folders(trimmed_dir: Path, params: Dict[str, Any]) -> List[str]:
+    """
+    构建音频文件夹列表：旁白音频文件夹 + 对白音频文件夹 (如果提供且存在)
+
+    Args:
+        trimmed_dir: 去除静音后的旁白音频文件夹
+        params: 请求参数字典
+
+    Returns:
+        音频文件夹路径列表
+    """
+    audio_folders = [str(trimmed_dir)]
+
+    dialogue_audio_folder = params.get("dialogue_audio_folder", "")
+    if not dialogue_audio_folder:
+        logger.warning("⚠️ 未配置对白音频文件夹，将只使用旁白音频")
+    elif os.path.exists(dialogue_audio_folder):
+        audio_folders.append(dialogue_audio_folder)
+        logger.info(f"✅ 已添加对白音频文件夹: {dialogue_audio_folder}")
+    else:
+        logger.warning(f"⚠️ 对白音频文件夹不存在: {dialogue_audio_folder}")
+
+    return audio_folders
+
+
+def _build_output_url(output_dir_name: str) -> str:
+    """
+    构造前端可访问的音频URL
+
+    Args:
+        output_dir_name: data/tasks 下的目录名 (task_id 或缓存键)
+    """
+    if not PUBLIC_BASE_URL:
+        return f"/media/{output_dir_name}/4_final_output.wav"
+    return f"{PUBLIC_BASE_URL}/media/{output_dir_name}/4_final_output.wav"
+
+
+def _save_story_book(params: Dict[str, Any], output_url: str):
+    """
+    将生成的音频路径写入用户故事书表，便于后续访问
+
+    与同时完成的其他任务的记录合并写入；返回时记录已落库，须在任务标记为终态之前调用
+
+    Args:
+        params: 请求参数字典 (包含 user_id/role_id/story_id 时才入库)
+        output_url: 音频可访问URL
+    """
+    user_id = params.get("user_id")
+    role_id = params.get("role_id")
+    story_id = params.get("story_id")
+    if user_id is not None and role_id is not None and story_id is not None:
+        get_user_story_book_writer().write(user_id, role_id, story_id, output_url)
+    else:
+        logger.info("ℹ️ 未提供 user_id/role_id/story_id，跳过故事书入库")
+
+
+def complete_task_from_cache(
+    task_id: str, params: Dict[str, Any], cache_key: str, cached_output: Path
+):
+    """
+    命中结果缓存时直接完成任务 (不执行流水线)
+
+    Args:
+        task_id: 任务ID
+        params: 请求参数字典
+        cache_key: 缓存键
+        cached_output: 缓存的最终音频路径
+    """
+    output_url = _build_output_url(cache_key)
+
+    _save_story_book(params, output_url)
+
+    task_manager.update_task(
+        task_id=task_id,
+        status=TaskStatus.COMPLETED,
+        progress="✅ 任务完成！已复用相同输入的生成结果",
+        current_step=4,
+        result={
+            "cache_key": cache_key,
+            "output_wav": str(cached_output),
+            "output_url": output_url,
+        },
+        output_wav=str(cached_output),
+        output_url=output_url,
+    )
+
+    logger.info(f"♻️ 任务命中结果缓存: {task_id} -> {cached_output}")
 
 
 # ============================================================================
@@ -53,9 +141,38 @@ gpu_semaphore = threading.Semaphore(1)
 # ============================================================================
 
 
-def generate_audio_pipeline(task_id: str, params: Dict[str, Any]):
+def submit_pipeline(task_id: str, params: Dict[str, Any]) -> TaskStatus:
     """
-    完整音频生成流水线
+    提交流水线任务: 命中结果缓存时直接完成，否则投递到 Celery 队列
+
+    API 进程中调用 (会同步计算输入文件哈希，异步接口中应放到线程中执行)
+
+    Args:
+        task_id: 任务ID
+        params: 请求参数字典 (会写入 cache_key 供流水线保存结果)
+
+    Returns:
+        任务提交后的状态
+    """
+    cache_key = result_cache.compute_cache_key(params)
+    if cache_key:
+        params["cache_key"] = cache_key
+        cached_output = result_cache.get_cached_output(cache_key)
+        if cached_output is not None:
+            complete_task_from_cache(task_id, params, cache_key, cached_output)
+            return TaskStatus.COMPLETED
+
+    # 投递到 Celery 队列，由 worker 进程执行
+    generate_audio_pipeline.delay(task_id, params)
+    return TaskStatus.PENDING
+
+
+@celery_app.task(bind=True, name="audio_pipeline.generate_audio_pipeline")
+def generate_audio_pipeline(self, task_id: str, params: Dict[str, Any]):
+    """
+    完整音频生成流水线 (Celery 任务)
+
+    通过 generate_audio_pipeline.delay(task_id, params) 投递到队列
 
     Args:
         task_id: 任务ID
@@ -72,8 +189,7 @@ def generate_audio_pipeline(task_id: str, params: Dict[str, Any]):
     task_dir = Path(f"data/tasks/{task_id}")
     task_dir.mkdir(parents=True, exist_ok=True)
 
-    logger.info(f"🚀 任务开始: {task_id}")
-    logger.info(f"📂 工作目录: {task_dir}")
+    logger.info("🚀 任务开始: %s\n📂 工作目录: %s", task_id, task_dir)
 
     # 定义各步骤的输出目录
     cloned_dir = task_dir / "1_cloned"
@@ -81,16 +197,10 @@ def generate_audio_pipeline(task_id: str, params: Dict[str, Any]):
     sequence_json = task_dir / "3_sequence.json"
     final_output = task_dir / "4_final_output.wav"
 
-    def _build_output_url() -> str:
-        """构造前端可访问的音频URL"""
-        if not PUBLIC_BASE_URL:
-            return f"/media/{task_id}/4_final_output.wav"
-        return f"{PUBLIC_BASE_URL}/media/{task_id}/4_final_output.wav"
-
     try:
         # 获取 GPU 锁 (阻塞等待，直到其他任务完成)
         logger.info("⏳ 等待 GPU 资源...")
-        with gpu_semaphore:
+        with RedisSemaphore(GPU_SEMAPHORE_KEY, limit=GPU_CONCURRENCY):
             logger.info("✅ 已获取 GPU 资源，开始执行")
 
             # ================================================================
@@ -183,6 +293,9 @@ def generate_audio_pipeline(task_id: str, params: Dict[str, Any]):
             )
             raise
 
+        # Step 3 和 Step 4 共用的音频文件夹列表 (旁白 + 对白)
+        audio_folders = _resolve_audio_folders(trimmed_dir, params)
+
         # ================================================================
         # Step 3: Build Sequence (构建序列)
         # ================================================================
@@ -195,20 +308,6 @@ def generate_audio_pipeline(task_id: str, params: Dict[str, Any]):
         logger.info("[Step 3/4] 开始构建序列")
 
         try:
-            # 音频文件夹列表：旁白 + 对白（如果提供）
-            audio_folders = [str(trimmed_dir)]
-            dialogue_audio_folder = params.get("dialogue_audio_folder", "")
-            if dialogue_audio_folder:
-                if os.path.exists(dialogue_audio_folder):
-                    audio_folders.append(dialogue_audio_folder)
-                    logger.info(f"✅ Step3 已添加对白音频文件夹: {dialogue_audio_folder}")
-                else:
-                    logger.warning(
-                        f"⚠️ Step3 对白音频文件夹不存在: {dialogue_audio_folder}"
-                    )
-            else:
-                logger.warning("⚠️ Step3 未配置对白音频文件夹，将只使用旁白音频")
-
             result_step3 = run_build_sequence(
                 source_audio=params["source_audio"],
                 script_json=params["script_json"],
@@ -251,20 +350,6 @@ def generate_audio_pipeline(task_id: str, params: Dict[str, Any]):
         logger.info("[Step 4/4] 开始对齐合成")
 
         try:
-            # 构建音频文件夹列表：包含旁白和对白两个文件夹
-            audio_folders = [str(trimmed_dir)]  # 旁白音频文件夹
-            
-            # 如果配置中提供了对话音频文件夹，添加到列表中
-            dialogue_audio_folder = params.get("dialogue_audio_folder", "")
-            if dialogue_audio_folder:
-                if os.path.exists(dialogue_audio_folder):
-                    audio_folders.append(dialogue_audio_folder)  # 对白音频文件夹
-                    logger.info(f"✅ 已添加对白音频文件夹: {dialogue_audio_folder}")
-                else:
-                    logger.warning(f"⚠️ 对白音频文件夹不存在: {dialogue_audio_folder}")
-            else:
-                logger.warning("⚠️ 未配置对白音频文件夹，将只使用旁白音频")
-
             result_step4 = run_alignment(
                 config_json=str(sequence_json),
                 audio_folders=audio_folders,
@@ -293,13 +378,24 @@ def generate_audio_pipeline(task_id: str, params: Dict[str, Any]):
             )
             raise
 
+        # 保存到结果缓存，相同输入的后续请求直接复用
+        cache_key = params.get("cache_key")
+        if cache_key:
+            try:
+                result_cache.store_output(cache_key, final_output)
+            except Exception as cache_error:
+                logger.warning(f"⚠️ 缓存生成结果失败: {cache_error}")
+
         # ================================================================
         # 任务成功完成
         # ================================================================
+        # 音频可访问URL只在完成时构造一次，随任务一起持久化
+        output_url = _build_output_url(task_id)
+
         final_result = {
             "task_dir": str(task_dir),
             "output_wav": str(final_output),
-            "output_url": _build_output_url(),
+            "output_url": output_url,
             "step1_voice_cloning": result_step1,
             "step2_trim_silence": result_step2,
             "step3_build_sequence": result_step3,
@@ -307,23 +403,7 @@ def generate_audio_pipeline(task_id: str, params: Dict[str, Any]):
         }
 
         # 将生成的音频路径写入用户故事书表，便于后续访问
-        user_id = params.get("user_id")
-        role_id = params.get("role_id")
-        story_id = params.get("story_id")
-        if user_id is not None and role_id is not None and story_id is not None:
-            try:
-                dao = UserStoryBookDAO()
-                dao.insert(
-                    user_id=user_id,
-                    role_id=role_id,
-                    story_id=story_id,
-                    story_book_path=_build_output_url(),
-                )
-                logger.info("✅ 已将生成的音频可访问URL写入 user_story_books")
-            except Exception as dao_error:
-                logger.error(f"❌ 写入用户故事书失败: {dao_error}")
-        else:
-            logger.info("ℹ️ 未提供 user_id/role_id/story_id，跳过故事书入库")
+        _save_story_book(params, output_url)
 
         task_manager.update_task(
             task_id=task_id,
@@ -332,21 +412,35 @@ def generate_audio_pipeline(task_id: str, params: Dict[str, Any]):
             current_step=4,
             result=final_result,
             output_wav=str(final_output),
-            output_url=_build_output_url(),
+            output_url=output_url,
         )
 
-        logger.info(f"🎉 任务完成: {task_id}")
-        logger.info(f"📁 最终输出: {final_output}")
+        # 任务汇总只记录一条日志，结构化字段通过 extra 提供给日志采集
+        logger.info(
+            "🎉 任务完成: %s\n📁 最终输出: %s",
+            task_id,
+            final_output,
+            extra={
+                "task_id": task_id,
+                "output_url": output_url,
+                "cloned": result_step1["success"],
+                "clone_total": result_step1["total"],
+            },
+        )
 
     except Exception as e:
         # 任务失败
         error_message = f"任务执行失败: {str(e)}"
 
         # 详细记录错误信息到日志
-        logger.error(f"❌ 任务失败: {task_id}")
-        logger.error(f"   错误类型: {type(e).__name__}")
-        logger.error(f"   错误信息: {error_message}")
-        logger.error(f"   任务参数: {params}")
+        logger.error(
+            "❌ 任务失败: %s\n   错误类型: %s\n   错误信息: %s\n   任务参数: %s",
+            task_id,
+            type(e).__name__,
+            error_message,
+            params,
+            extra={"task_id": task_id, "error_type": type(e).__name__},
+        )
 
         # 更新任务状态为失败（短暂保留以便日志记录）
         task_manager.update_task(
@@ -358,8 +452,7 @@ def generate_audio_pipeline(task_id: str, params: Dict[str, Any]):
 
         # 自动删除失败的任务
         try:
-            logger.info(f"🗑️ 自动删除失败任务: {task_id}")
             task_manager.delete_task(task_id)
-            logger.info(f"✅ 失败任务已删除: {task_id}")
+            logger.info("🗑️ 已自动删除失败任务: %s", task_id)
         except Exception as delete_error:
             logger.error(f"⚠️ 删除失败任务时出错: {str(delete_error)}")
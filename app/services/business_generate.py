@@ -4,28 +4,69 @@
 提供基于ID的音频生成功能，自动处理配置文件读取和数据库查询
 """
 
-import json
 import logging
+import os
+from functools import cache, cached_property, lru_cache
 from typing import Dict, Any
-from pathlib import Path
+
+import orjson
+
+from app import PROJECT_ROOT
+
+try:
+    from scripts.user_input_audio_dao import UserInputAudioDAO
+except ImportError as e:
+    raise ImportError(f"无法导入数据库模块 scripts.user_input_audio_dao: {e}") from e
+
+from scripts.config_loader import load_json_config
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=256)
+def _story_config_path(config_dir: str, story_id: int) -> str:
+    """故事配置文件路径 (按 story_id 缓存，避免每次请求重新拼接路径)"""
+    return os.path.join(config_dir, f"story_library_{story_id}.json")
+
+
 class BusinessGenerateService:
     """业务层音频生成服务"""
 
+    # 必需的配置项（全部必填且不能为空）
+    REQUIRED_FIELDS = frozenset(
+        {
+            "json_db",
+            "emo_audio_folder",
+            "source_audio",
+            "script_json",
+            "bgm_path",
+            "dialogue_audio_folder",
+            "task_name",
+        }
+    )
+
     def __init__(self):
         """初始化服务"""
         # 获取项目根目录
-        self.project_root = Path(__file__).parent.parent.parent
+        self.project_root = PROJECT_ROOT
         self.config_dir = self.project_root / "config"
-        logger.info(f"业务生成服务初始化完成，配置目录: {self.config_dir}")
+        self._config_dir_str = str(self.config_dir)
+        # 已通过验证的配置: story_id -> 配置对象 (文件未变化时 config_loader 返回同一对象)
+        self._validated_configs: Dict[int, Dict[str, Any]] = {}
+
+        logger.info("业务生成服务初始化完成，配置目录: %s", self.config_dir)
+
+    @cached_property
+    def _user_audio_dao(self) -> UserInputAudioDAO:
+        """用户输入音频 DAO (首次使用时创建，进程内复用，底层使用连接池)"""
+        return UserInputAudioDAO()
 
     def get_story_config(self, story_id: int) -> Dict[str, Any]:
         """
         根据story_id读取配置文件
 
+        解析结果按文件修改时间缓存 (scripts.config_loader)，文件未变化时不再重复解析和验证
+
         Args:
             story_id: 故事ID
 
@@ -36,49 +77,44 @@ class BusinessGenerateService:
             FileNotFoundError: 配置文件不存在
             ValueError: 配置文件格式错误或缺少必需参数
         """
-        config_path = self.config_dir / f"story_library_{story_id}.json"
-        logger.info(f"读取故事配置文件: {config_path}")
+        config_path = _story_config_path(self._config_dir_str, story_id)
 
-        if not config_path.exists():
+        try:
+            config = load_json_config(config_path)
+        except FileNotFoundError:
             error_msg = f"未找到故事配置文件: story_library_{story_id}.json"
             logger.error(error_msg)
             raise FileNotFoundError(error_msg)
-
-        try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = json.load(f)
-            logger.info(f"配置文件读取成功: {config_path}")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             error_msg = f"配置文件格式错误: {str(e)}"
             logger.error(error_msg)
             raise ValueError(error_msg)
 
-        # 验证必需的配置项（全部必填且不能为空）
-        required_fields = [
-            "json_db",
-            "emo_audio_folder",
-            "source_audio",
-            "script_json",
-            "bgm_path",
-            "dialogue_audio_folder",
-            "task_name",
-        ]
-        missing_fields = [field for field in required_fields if field not in config]
-        empty_fields = [
-            field for field in required_fields if not config.get(field)
-        ]
+        # 同一配置对象已经验证过，直接返回
+        if self._validated_configs.get(story_id) is config:
+            return config
+
+        # 验证必需的配置项（全部必填且不能为空），一次遍历同时找出缺少和为空的字段
+        missing_fields = []
+        empty_fields = []
+        for field in self.REQUIRED_FIELDS:
+            if field not in config:
+                missing_fields.append(field)
+            elif not config[field]:
+                empty_fields.append(field)
 
         if missing_fields or empty_fields:
             details = []
             if missing_fields:
-                details.append(f"缺少: {', '.join(missing_fields)}")
+                details.append(f"缺少: {', '.join(sorted(missing_fields))}")
             if empty_fields:
-                details.append(f"为空: {', '.join(empty_fields)}")
+                details.append(f"为空: {', '.join(sorted(empty_fields))}")
             error_msg = f"配置文件缺少必需字段或字段为空 ({'; '.join(details)})"
             logger.error(error_msg)
             raise ValueError(error_msg)
 
-        logger.info(f"配置验证通过，包含字段: {list(config.keys())}")
+        logger.debug("配置验证通过，包含字段: %s", list(config))
+        self._validated_configs[story_id] = config
         return config
 
     def get_user_audio_path(self, user_id: int, role_id: int) -> str:
@@ -93,47 +129,26 @@ class BusinessGenerateService:
             音频文件路径 (clean_input字段)
 
         Raises:
-            ImportError: 无法导入DAO
             ValueError: 未找到用户音频记录
         """
-        try:
-            # 动态导入DAO，避免循环依赖
-            import sys
-
-            scripts_path = str(self.project_root / "scripts")
-            if scripts_path not in sys.path:
-                sys.path.insert(0, scripts_path)
-
-            from scripts.user_input_audio_dao import UserInputAudioDAO
-
-            logger.info(f"查询用户输入音频: user_id={user_id}, role_id={role_id}")
-            dao = UserInputAudioDAO()
-            record = dao.find_by_user_and_role(user_id, role_id)
-
-            if not record:
-                error_msg = "请先生成您的克隆声音"
-                logger.error(
-                    f"用户输入音频记录为空: user_id={user_id}, role_id={role_id}"
-                )
-                raise ValueError(error_msg)
+        logger.info("查询用户输入音频: user_id=%s, role_id=%s", user_id, role_id)
+        record = self._user_audio_dao.find_by_user_and_role(user_id, role_id)
 
-            # 仅使用clean_input字段
-            audio_path = record.get("clean_input")
+        if not record:
+            error_msg = "请先生成您的克隆声音"
+            logger.error("用户输入音频记录为空: user_id=%s, role_id=%s", user_id, role_id)
+            raise ValueError(error_msg)
 
-            if not audio_path:
-                error_msg = "音频文件路径不存在，请重新生成克隆声音"
-                logger.error(
-                    f"clean_input字段为空: user_id={user_id}, role_id={role_id}"
-                )
-                raise ValueError(error_msg)
+        # 仅使用clean_input字段
+        audio_path = record.get("clean_input")
 
-            logger.info(f"成功获取用户音频路径: {audio_path}")
-            return audio_path
+        if not audio_path:
+            error_msg = "音频文件路径不存在，请重新生成克隆声音"
+            logger.error("clean_input字段为空: user_id=%s, role_id=%s", user_id, role_id)
+            raise ValueError(error_msg)
 
-        except ImportError as e:
-            error_msg = f"无法导入数据库模块: {str(e)}"
-            logger.error(error_msg)
-            raise ImportError(error_msg)
+        logger.info("成功获取用户音频路径: %s", audio_path)
+        return audio_path
 
     def prepare_generation_params(
         self, story_id: int, user_id: int, role_id: int, task_name: str = None
@@ -157,7 +172,7 @@ class BusinessGenerateService:
             ValueError: 配置错误或数据库查询失败
         """
         logger.info(
-            f"准备生成参数: story_id={story_id}, user_id={user_id}, role_id={role_id}"
+            "准备生成参数: story_id=%s, user_id=%s, role_id=%s", story_id, user_id, role_id
         )
 
         # 1. 读取故事配置
@@ -173,8 +188,6 @@ class BusinessGenerateService:
             input_wav = self.get_user_audio_path(user_id, role_id)
         except ValueError as e:
             raise ValueError(str(e))
-        except ImportError:
-            raise ValueError("系统错误: 无法访问数据库")
 
         # 3. 组装参数
         params = {
@@ -192,9 +205,15 @@ class BusinessGenerateService:
             "role_id": role_id,
         }
 
-        logger.info(f"生成参数准备完成: {params}")
+        logger.info("生成参数准备完成: %s", params)
         return params
 
 
-# 创建全局服务实例
-business_generate_service = BusinessGenerateService()
+@cache
+def get_service() -> BusinessGenerateService:
+    """
+    获取全局服务实例 (首次调用时创建)
+
+    模块导入时不创建实例，避免导入即加载数据库配置
+    """
+    return BusinessGenerateService()
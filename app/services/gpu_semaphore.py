@@ -0,0 +1,136 @@
+"""
+GPU 并发控制 (基于 Redis 的跨进程信号量)
+
+流水线由多个 Celery worker 进程 (可能分布在多台机器上) 执行，
+进程内的 threading.Semaphore 无法限制它们同时占用 GPU。
+这里用 Redis 有序集合实现信号量，所有 worker 共享同一个名额上限:
+- 每个持有者以唯一 token 记录在有序集合中，分数为最近一次续期的时间
+- 持有期间后台线程定期续期；worker 崩溃后名额在租约到期时自动回收
+- 获取与回收过期名额在同一个 Lua 脚本中完成，保证原子性
+- 租约时间统一取 Redis 服务器时间 (TIME)，不依赖各台机器的本地时钟
+"""
+
+import os
+import threading
+import time
+import uuid
+import logging
+
+import redis
+
+from app.celery_app import REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+# 信号量在 Redis 中的键名
+GPU_SEMAPHORE_KEY = "tts:gpu_semaphore"
+
+# 同时执行 AI 推理的任务数上限 (防止GPU显存溢出)，可通过环境变量覆盖
+GPU_CONCURRENCY = int(os.getenv("GPU_CONCURRENCY", "1"))
+
+# 租约时长 (秒)：持有者超过该时间未续期视为已失效
+GPU_LEASE_SECONDS = 60
+
+# 等待名额时的轮询间隔 (秒)
+GPU_POLL_INTERVAL = 1.0
+
+# 原子操作: 回收过期名额，名额未满时加入当前持有者
+# KEYS[1]: 有序集合  ARGV: lease, limit, token
+_ACQUIRE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[1]))
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], now, ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# 原子操作: 持有者仍在集合中时续期，返回是否仍持有名额
+# KEYS[1]: 有序集合  ARGV: token
+_RENEW_SCRIPT = """
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    return 0
+end
+local time = redis.call('TIME')
+redis.call('ZADD', KEYS[1], tonumber(time[1]) + tonumber(time[2]) / 1000000, ARGV[1])
+return 1
+"""
+
+
+class RedisSemaphore:
+    """
+    基于 Redis 的跨进程信号量 (上下文管理器)
+
+    使用示例:
+        >>> with RedisSemaphore(GPU_SEMAPHORE_KEY, limit=GPU_CONCURRENCY):
+        ...     run_voice_cloning(...)
+    """
+
+    def __init__(self, name: str, limit: int, lease_seconds: int = GPU_LEASE_SECONDS):
+        """
+        Args:
+            name: Redis 键名
+            limit: 名额上限
+            lease_seconds: 租约时长 (秒)
+        """
+        self.name = name
+        self.limit = limit
+        self.lease_seconds = lease_seconds
+        self._redis = redis.Redis.from_url(REDIS_URL)
+        self._acquire = self._redis.register_script(_ACQUIRE_SCRIPT)
+        self._renew_lease = self._redis.register_script(_RENEW_SCRIPT)
+        self._token = None
+        self._stop_renew = threading.Event()
+        self._renew_thread = None
+
+    def acquire(self):
+        """阻塞等待，直到获取名额"""
+        token = uuid.uuid4().hex
+        while not self._acquire(
+            keys=[self.name],
+            args=[self.lease_seconds, self.limit, token],
+        ):
+            time.sleep(GPU_POLL_INTERVAL)
+
+        self._token = token
+        self._stop_renew.clear()
+        self._renew_thread = threading.Thread(target=self._renew, daemon=True)
+        self._renew_thread.start()
+
+    def release(self):
+        """释放名额"""
+        self._stop_renew.set()
+        if self._renew_thread is not None:
+            self._renew_thread.join()
+            self._renew_thread = None
+        if self._token is not None:
+            self._redis.zrem(self.name, self._token)
+            self._token = None
+
+    def _renew(self):
+        """持有期间定期续期，避免长时间推理时名额被回收"""
+        interval = self.lease_seconds / 3
+        while not self._stop_renew.wait(interval):
+            try:
+                held = self._renew_lease(keys=[self.name], args=[self._token])
+            except redis.RedisError as e:
+                logger.warning("⚠️ GPU 信号量续期失败: %s", e)
+                continue
+            if not held:
+                # 租约已过期被回收 (例如续期长时间失败)，名额可能已被其他任务占用
+                logger.error(
+                    "❌ GPU 信号量租约已失效，名额已被回收: %s (token=%s)",
+                    self.name,
+                    self._token,
+                )
+                return
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+        return False
@@ -0,0 +1,191 @@
+"""
+生成结果缓存 (Result Cache)
+
+相同输入 (影响结果的参数 + 输入文件内容) 生成的最终音频完全相同。
+以输入的内容哈希作为缓存键，最终音频保存在 data/tasks/<cache_key>/4_final_output.wav，
+重复请求命中缓存时直接复用，跳过语音克隆等耗时步骤。
+
+说明:
+- 输入文件按内容哈希，哈希结果按 (路径, mtime, 文件大小) 缓存 (LRU)，避免重复读取大文件
+- 文件夹类参数 (emo_audio_folder / dialogue_audio_folder) 按路径和目录签名参与哈希:
+  目录签名为各文件 (文件名, mtime, 文件大小) 排序后的列表，文件夹中的音频更新后缓存键随之变化
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+import orjson
+
+# 可选依赖: blake3 (多线程 SIMD 实现，哈希大音频文件明显快于 blake2b)
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+logger = logging.getLogger(__name__)
+
+# 缓存根目录 (与任务目录相同，缓存结果可直接通过 /media/<cache_key>/ 访问)
+CACHE_ROOT = Path("data/tasks")
+
+# 缓存的最终音频文件名
+CACHE_OUTPUT_NAME = "4_final_output.wav"
+
+# 影响生成结果的参数 (及其默认值)
+CACHE_PARAM_DEFAULTS: Dict[str, Any] = {
+    "input_wav": None,
+    "json_db": None,
+    "emo_audio_folder": None,
+    "silence_thresh": -40,
+    "source_audio": None,
+    "script_json": None,
+    "bgm_path": None,
+    "dialogue_audio_folder": None,
+}
+
+# 需要按内容哈希的输入文件参数
+CACHE_FILE_KEYS = ("input_wav", "json_db", "source_audio", "script_json", "bgm_path")
+
+# 需要按目录签名参与哈希的文件夹参数
+CACHE_FOLDER_KEYS = ("emo_audio_folder", "dialogue_audio_folder")
+
+# 读取文件时的分块大小
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# 文件哈希缓存的最大条目数 (按 LRU 淘汰)
+FILE_DIGEST_CACHE_SIZE = 256
+
+# 文件哈希缓存: path -> (mtime_ns, size, digest)
+_file_digest_cache: "OrderedDict[str, Tuple[int, int, bytes]]" = OrderedDict()
+_file_digest_lock = threading.Lock()
+
+
+def _file_digest(path: str) -> bytes:
+    """
+    计算文件内容哈希 (按 mtime 和文件大小缓存)
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        文件内容摘要 (安装了 blake3 时使用 blake3，否则使用 blake2b)
+    """
+    stat = os.stat(path)
+    with _file_digest_lock:
+        cached = _file_digest_cache.get(path)
+        if cached is not None:
+            _file_digest_cache.move_to_end(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    if blake3 is not None:
+        hasher = blake3(max_threads=blake3.AUTO)
+    else:
+        hasher = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    digest = hasher.digest()[:16]
+
+    with _file_digest_lock:
+        _file_digest_cache[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        _file_digest_cache.move_to_end(path)
+        if len(_file_digest_cache) > FILE_DIGEST_CACHE_SIZE:
+            _file_digest_cache.popitem(last=False)
+    return digest
+
+
+def _folder_signature(path: str) -> bytes:
+    """
+    计算文件夹签名 (一次 os.scandir，不读取文件内容)
+
+    Args:
+        path: 文件夹路径
+
+    Returns:
+        各文件 (文件名, mtime, 文件大小) 排序后的序列化结果
+    """
+    entries = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    entries.sort()
+    return orjson.dumps(entries)
+
+
+def compute_cache_key(params: Dict[str, Any]) -> Optional[str]:
+    """
+    计算生成参数的缓存键
+
+    Args:
+        params: 请求参数字典
+
+    Returns:
+        缓存键 (32位十六进制字符串)；输入文件不可读时返回 None (不使用缓存)
+    """
+    key_params = {
+        key: params.get(key, default) for key, default in CACHE_PARAM_DEFAULTS.items()
+    }
+
+    hasher = hashlib.blake2b(
+        orjson.dumps(key_params, option=orjson.OPT_SORT_KEYS), digest_size=16
+    )
+    try:
+        for key in CACHE_FILE_KEYS:
+            if key_params[key]:
+                hasher.update(_file_digest(key_params[key]))
+        for key in CACHE_FOLDER_KEYS:
+            if key_params[key]:
+                hasher.update(_folder_signature(key_params[key]))
+    except OSError as e:
+        logger.warning(f"⚠️ 无法计算缓存键，跳过结果缓存: {e}")
+        return None
+
+    return hasher.hexdigest()
+
+
+def get_cached_output(cache_key: str) -> Optional[Path]:
+    """
+    查找缓存的最终音频
+
+    Args:
+        cache_key: 缓存键
+
+    Returns:
+        缓存的音频文件路径，未命中返回 None
+    """
+    output = CACHE_ROOT / cache_key / CACHE_OUTPUT_NAME
+    return output if output.is_file() else None
+
+
+def store_output(cache_key: str, final_output: Path):
+    """
+    将流水线生成的最终音频保存到缓存
+
+    优先使用硬链接 (不额外占用磁盘空间)，失败时复制文件；
+    先写入临时文件再原子替换，避免并发读取到不完整的文件
+
+    Args:
+        cache_key: 缓存键
+        final_output: 最终音频路径
+    """
+    cache_dir = CACHE_ROOT / cache_key
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    target = cache_dir / CACHE_OUTPUT_NAME
+    tmp_target = cache_dir / f".{CACHE_OUTPUT_NAME}.{os.getpid()}.tmp"
+
+    try:
+        os.link(final_output, tmp_target)
+    except OSError:
+        shutil.copyfile(final_output, tmp_target)
+    os.replace(tmp_target, target)
+
+    logger.info(f"💾 已缓存生成结果: {target}")
@@ -0,0 +1,137 @@
+"""
+用户故事书批量写入器 (Story Book Writer)
+
+流水线完成时需要向 user_story_books 表写入一条记录。
+多个任务集中完成时，逐条 INSERT 会产生大量数据库往返；
+这里把记录放入内存队列，由后台线程按时间窗口合并后批量写入 (组提交):
+- 队列中积累到 MAX_BATCH 条，或距离第一条记录超过 FLUSH_INTERVAL 秒时写入
+- 调用方阻塞到所在批次写入完成，流水线将任务标记为完成前记录已落库
+- 写入器在首次写入时创建，模块导入时不连接数据库
+- 进程退出时写出队列中剩余的记录
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from functools import cache
+from typing import List, Tuple
+import logging
+
+from scripts.user_story_book_dao import UserStoryBookDAO
+
+logger = logging.getLogger(__name__)
+
+# 合并写入的时间窗口 (秒)
+FLUSH_INTERVAL = 0.1
+
+# 单批最多写入的记录数
+MAX_BATCH = 64
+
+# 停止后台线程的哨兵
+_STOP = object()
+
+
+class UserStoryBookWriter:
+    """
+    用户故事书批量写入器
+
+    使用示例:
+        >>> get_user_story_book_writer().write(user_id, role_id, story_id, output_url)
+    """
+
+    def __init__(self):
+        self._dao = UserStoryBookDAO()
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def write(self, user_id: int, role_id: int, story_id: int, story_book_path: str):
+        """
+        写入一条记录 (与其他线程同时提交的记录合并写入，阻塞到所在批次写入完成)
+
+        写入失败只记录日志，不向调用方抛出
+
+        Args:
+            user_id: 用户ID
+            role_id: 角色ID
+            story_id: 故事ID
+            story_book_path: 音频可访问URL
+        """
+        done = threading.Event()
+        self._ensure_started()
+        self._queue.put(((user_id, role_id, story_id, story_book_path), done))
+        done.wait()
+
+    def _ensure_started(self):
+        """按需启动后台线程 (fork 出的子进程中重新启动)"""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.SimpleQueue()
+            self._thread = threading.Thread(
+                target=self._run, name="story_book_writer", daemon=True
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        """后台线程: 合并队列中的记录并批量写入"""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch: List[Tuple[Tuple[int, int, int, str], threading.Event]] = [item]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            stop = False
+            while len(batch) < MAX_BATCH:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._write([record for record, _ in batch])
+            for _, done in batch:
+                done.set()
+            if stop:
+                return
+
+    def _write(self, batch: List[Tuple[int, int, int, str]]):
+        """写入一批记录"""
+        try:
+            self._dao.insert_many(batch)
+            logger.info(f"✅ 已将 {len(batch)} 条生成音频URL写入 user_story_books")
+        except Exception as e:
+            logger.error(f"❌ 写入用户故事书失败 ({len(batch)} 条): {e}")
+
+    def close(self):
+        """写出队列中剩余的记录并停止后台线程"""
+        if self._pid != os.getpid() or self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._pid = None
+
+
+@cache
+def get_user_story_book_writer() -> UserStoryBookWriter:
+    """
+    获取全局写入器实例 (首次调用时创建)
+
+    模块导入时不创建实例，避免导入即加载数据库配置
+    """
+    writer = UserStoryBookWriter()
+    atexit.register(writer.close)
+    return writer
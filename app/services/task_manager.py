@@ -2,23 +2,41 @@
 任务管理器 (Task Manager)
 
 单例模式的任务管理器，负责：
-1. 管理任务状态 (内存字典 + 持久化到 tasks.json)
-2. 线程安全的状态更新
-3. 服务启动时从 tasks.json 恢复历史任务
+1. 管理任务状态 (持久化到 SQLite 数据库 data/tasks.db)
+2. 线程安全、进程安全的状态更新
+3. 多个 API worker 进程与 Celery worker 进程共享同一份任务状态
+4. 首次启动时从旧版 tasks.json 导入历史任务
+5. 每次变更时序列化一次任务 JSON，查询接口直接返回，无需重复序列化
 """
 
-import json
 import os
+import sqlite3
 import threading
-from typing import Dict, Optional, List
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional, List
 from datetime import datetime
 from pathlib import Path
 import logging
 
+import orjson
+
 from app.models import TaskStatus, StepProgress, TaskStatusResponse
 
 logger = logging.getLogger(__name__)
 
+# 任务列表单次查询的数量上限 (接口参数校验使用)
+MAX_QUERY_LIMIT = 1000
+
+# 任务列表查询缓存的最大条目数 (按 LRU 淘汰)
+QUERY_CACHE_SIZE = 32
+
+# 终态: 进入终态的更新提交时同步刷盘
+TERMINAL_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED)
+
+# 合法的任务状态值 (筛选条件不在其中时不会匹配任何任务)
+TASK_STATUS_VALUES = frozenset(s.value for s in TaskStatus)
+
 
 class TaskManager:
     """
@@ -26,8 +44,9 @@ class TaskManager:
 
     特性:
     - 单例模式 (保证全局只有一个实例)
-    - 线程安全 (使用 threading.Lock)
-    - 持久化 (每次状态变更写入 tasks.json)
+    - 线程安全 (使用 threading.Lock 保护共享写连接，单任务查询使用线程独立的读连接)
+    - 进程安全 (SQLite 事务，Gunicorn 多 worker 与 Celery worker 共享状态)
+    - 持久化 (每次状态变更提交到 tasks.db，WAL 检查点时批量刷盘)
     """
 
     _instance = None
@@ -48,53 +67,162 @@ class TaskManager:
             return
 
         self._initialized = True
-        self.tasks: Dict[str, dict] = {}
         self._task_lock = threading.Lock()  # 实例级别的锁，用于任务操作
 
-        # 持久化文件路径
-        self.persistence_file = Path("data/tasks.json")
-        self.persistence_file.parent.mkdir(parents=True, exist_ok=True)
-
-        # 从文件加载历史任务
-        self._load_from_file()
+        # 持久化数据库路径
+        self.db_file = Path("data/tasks.db")
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+
+        # 旧版持久化文件 (仅用于首次启动时迁移)
+        self.legacy_file = Path("data/tasks.json")
+
+        # isolation_level=None: 由 _transaction 显式控制事务边界
+        self._conn = sqlite3.connect(
+            str(self.db_file),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        # WAL 模式: 读操作不阻塞写操作，适合多进程并发轮询
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL 模式下 synchronous=NORMAL: 提交时不再逐次 fsync，
+        # 由检查点批量刷盘 (断电时可能丢失最近的进度更新，但不会损坏数据库)；
+        # 任务进入终态的提交单独同步刷盘，见 _transaction(durable=True)
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                data BLOB NOT NULL
+            )
+            """
+        )
+        # 任务列表查询: 按状态筛选 + 按创建时间倒序
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_status_created_at "
+            "ON tasks (status, created_at)"
+        )
+
+        # 每个线程独立的读连接: 单任务查询 (状态轮询) 不获取 _task_lock，
+        # WAL 模式下也不会被写事务阻塞
+        self._local = threading.local()
+
+        # 读缓存: 数据未变化时，并发读取共享同一份结果
+        # 本进程每次写入递增 _write_version，其他进程的写入由 PRAGMA data_version 反映
+        self._write_version = 0
+        self._read_cache_version: Optional[tuple] = None
+        # 任务列表查询缓存: (status, limit) -> 任务列表 (LRU，最多 QUERY_CACHE_SIZE 条)
+        self._query_cache: "OrderedDict[tuple, List[dict]]" = OrderedDict()
+
+        # 从旧版 tasks.json 导入历史任务
+        self._migrate_legacy_file()
 
         logger.info("✅ TaskManager 初始化完成")
 
-    def _load_from_file(self):
-        """从 tasks.json 加载历史任务"""
-        if not self.persistence_file.exists():
-            logger.info("📂 未找到历史任务文件，从空状态开始")
+    def _migrate_legacy_file(self):
+        """首次启动时从 tasks.json 导入历史任务"""
+        if not self.legacy_file.exists():
             return
 
         try:
-            with open(self.persistence_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                self.tasks = data
-                logger.info(f"✅ 已加载 {len(self.tasks)} 个历史任务")
+            data = orjson.loads(self.legacy_file.read_bytes())
+
+            with self._transaction() as conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO tasks (task_id, status, created_at, data) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (task_id, task["status"], task["created_at"], self._dumps(task))
+                        for task_id, task in data.items()
+                    ],
+                )
+
+            self.legacy_file.rename(self.legacy_file.with_suffix(".json.migrated"))
+            logger.info(f"✅ 已从 tasks.json 导入 {len(data)} 个历史任务")
         except Exception as e:
-            logger.error(f"❌ 加载历史任务失败: {e}")
-            self.tasks = {}
+            logger.error(f"❌ 导入历史任务失败: {e}")
 
-    def _save_to_file(self):
+    @staticmethod
+    def _dumps(task: dict) -> bytes:
         """
-        将当前任务状态保存到 tasks.json
+        序列化任务对象
 
-        注意: 调用此方法前应该已经持有 _task_lock
+        结果与 TaskStatusResponse 的 JSON 结构一致，可直接作为接口响应返回
         """
-        try:
-            # 确保目录存在
-            self.persistence_file.parent.mkdir(parents=True, exist_ok=True)
+        return orjson.dumps(task, default=str)
 
-            # 写入临时文件，然后原子性重命名 (防止写入过程中断导致文件损坏)
-            temp_file = self.persistence_file.with_suffix(".tmp")
-            with open(temp_file, "w", encoding="utf-8") as f:
-                json.dump(self.tasks, f, ensure_ascii=False, indent=2, default=str)
+    @contextmanager
+    def _transaction(self, durable: bool = False):
+        """
+        写事务 (线程锁 + SQLite 写锁)
 
-            # 原子性替换
-            temp_file.replace(self.persistence_file)
+        BEGIN IMMEDIATE 立即获取数据库写锁，保证读-改-写过程中
+        不会被其他进程 (API worker / Celery worker) 的写入打断
 
-        except Exception as e:
-            logger.error(f"❌ 保存任务状态失败: {e}")
+        Args:
+            durable: 提交时同步刷盘 (synchronous=FULL)，用于不能丢失的终态更新；
+                普通进度更新沿用 synchronous=NORMAL，不逐次 fsync
+        """
+        with self._task_lock:
+            # 同步级别不能在事务中修改，需在 BEGIN 之前切换
+            if durable:
+                self._conn.execute("PRAGMA synchronous=FULL")
+            try:
+                total_changes = self._conn.total_changes
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield self._conn
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+                # 事务中没有实际写入时，读缓存仍然有效
+                if self._conn.total_changes != total_changes:
+                    self._write_version += 1
+            finally:
+                if durable:
+                    self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    def _read_conn(self) -> sqlite3.Connection:
+        """当前线程的读连接 (按需创建，fork 出的子进程中重新创建)"""
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            local.conn = sqlite3.connect(
+                str(self.db_file),
+                timeout=30,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            local.pid = os.getpid()
+        return local.conn
+
+    def _sync_read_caches(self):
+        """数据版本变化时清空读缓存 (调用方负责加锁)"""
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        version = (data_version, self._write_version)
+        if version != self._read_cache_version:
+            self._query_cache.clear()
+            self._read_cache_version = version
+
+    def _load_task(self, conn: sqlite3.Connection, task_id: str) -> Optional[dict]:
+        """读取单个任务 (使用共享连接时调用方负责加锁)"""
+        row = conn.execute(
+            "SELECT data FROM tasks WHERE task_id = ?", (task_id,)
+        ).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def _store_task(self, conn: sqlite3.Connection, task: dict):
+        """写入单个任务 (调用方负责开启事务)"""
+        conn.execute(
+            "INSERT OR REPLACE INTO tasks (task_id, status, created_at, data) "
+            "VALUES (?, ?, ?, ?)",
+            (task["task_id"], task["status"], task["created_at"], self._dumps(task)),
+        )
 
     def create_task(
         self, task_id: str, task_name: Optional[str] = None, total_steps: int = 4
@@ -110,8 +238,8 @@ class TaskManager:
         Returns:
             创建的任务对象
         """
-        with self._task_lock:
-            now = datetime.now()
+        with self._transaction() as conn:
+            now = datetime.now().isoformat()
 
             task = {
                 "task_id": task_id,
@@ -125,16 +253,15 @@ class TaskManager:
                 "output_wav": None,
                 "output_url": None,
                 "error": None,
-                "created_at": now.isoformat(),
-                "updated_at": now.isoformat(),
+                "created_at": now,
+                "updated_at": now,
                 "completed_at": None,
             }
 
-            self.tasks[task_id] = task
-            self._save_to_file()
+            self._store_task(conn, task)
 
-            logger.info(f"✅ 任务已创建: {task_id}")
-            return task
+        logger.info(f"✅ 任务已创建: {task_id}")
+        return task
 
     def update_task(
         self,
@@ -159,40 +286,44 @@ class TaskManager:
             output_wav: 输出文件路径
             error: 错误信息
         """
-        with self._task_lock:
-            if task_id not in self.tasks:
+        with self._transaction(durable=status in TERMINAL_STATUSES) as conn:
+            task = self._load_task(conn, task_id)
+            if task is None:
                 logger.warning(f"⚠️ 任务不存在: {task_id}")
                 return
 
-            task = self.tasks[task_id]
+            # 只保留与当前值不同的字段；没有任何变化时不写入 (也不更新时间戳)
+            changes = {
+                key: value
+                for key, value in (
+                    ("status", status),
+                    ("progress", progress),
+                    ("current_step", current_step),
+                    ("result", result),
+                    ("output_wav", output_wav),
+                    ("output_url", output_url),
+                    ("error", error),
+                )
+                if value is not None and task.get(key) != value
+            }
+            if not changes:
+                return
 
             # 更新字段
-            if status is not None:
-                task["status"] = status
-            if progress is not None:
-                task["progress"] = progress
-            if current_step is not None:
-                task["current_step"] = current_step
-            if result is not None:
-                task["result"] = result
-            if output_wav is not None:
-                task["output_wav"] = output_wav
-            if output_url is not None:
-                task["output_url"] = output_url
-            if error is not None:
-                task["error"] = error
-
-            # 更新时间戳
-            task["updated_at"] = datetime.now().isoformat()
+            task.update(changes)
+
+            # 更新时间戳 (同一次更新只取一次当前时间)
+            now = datetime.now().isoformat()
+            task["updated_at"] = now
 
             # 如果任务完成或失败，记录完成时间
-            if status in [TaskStatus.COMPLETED, TaskStatus.FAILED]:
-                task["completed_at"] = datetime.now().isoformat()
+            if changes.get("status") in TERMINAL_STATUSES:
+                task["completed_at"] = now
 
             # 持久化
-            self._save_to_file()
+            self._store_task(conn, task)
 
-            logger.info(f"📝 任务已更新: {task_id} - {status} - {progress}")
+        logger.info(f"📝 任务已更新: {task_id} - {status} - {progress}")
 
     def add_step_result(
         self,
@@ -214,12 +345,11 @@ class TaskManager:
             result: 步骤结果
             error: 错误信息
         """
-        with self._task_lock:
-            if task_id not in self.tasks:
+        with self._transaction() as conn:
+            task = self._load_task(conn, task_id)
+            if task is None:
                 return
 
-            task = self.tasks[task_id]
-
             step_data = {
                 "step_number": step_number,
                 "step_name": step_name,
@@ -239,12 +369,15 @@ class TaskManager:
             )
 
             if existing_step_index is not None:
+                # 步骤结果没有变化时不写入
+                if task["steps"][existing_step_index] == step_data:
+                    return
                 task["steps"][existing_step_index] = step_data
             else:
                 task["steps"].append(step_data)
 
             # 持久化
-            self._save_to_file()
+            self._store_task(conn, task)
 
     def get_task(self, task_id: str) -> Optional[dict]:
         """
@@ -256,18 +389,72 @@ class TaskManager:
         Returns:
             任务对象，如果不存在返回 None
         """
-        with self._task_lock:
-            return self.tasks.get(task_id)
+        return self._load_task(self._read_conn(), task_id)
 
-    def get_all_tasks(self) -> List[dict]:
+    def get_task_json(self, task_id: str) -> Optional[bytes]:
         """
-        获取所有任务
+        获取任务的 JSON 序列化结果
+
+        任务 JSON 在每次变更时生成并保存，读取时直接返回，
+        省去轮询接口上的 Pydantic 校验与重复序列化
+
+        Args:
+            task_id: 任务ID
 
         Returns:
-            任务列表
+            任务 JSON (bytes)，如果不存在返回 None
+        """
+        row = (
+            self._read_conn()
+            .execute("SELECT data FROM tasks WHERE task_id = ?", (task_id,))
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def query_tasks(self, status: Optional[str] = None, limit: int = 100) -> List[dict]:
         """
+        按状态筛选、按创建时间倒序查询任务
+
+        筛选、排序和截取都在数据库中通过索引完成；
+        结果按 (status, limit) 缓存 (LRU，最多 QUERY_CACHE_SIZE 条)，任意进程写入任务后缓存自动失效
+
+        Args:
+            status: 按状态筛选 (可选，未知状态返回空列表)
+            limit: 返回数量限制
+
+        Returns:
+            任务列表 (共享的缓存对象，调用方不应修改)
+        """
+        # 未知状态不会匹配任何任务，直接返回空列表 (不查询数据库，也不占用查询缓存)
+        if status and status not in TASK_STATUS_VALUES:
+            return []
+
         with self._task_lock:
-            return list(self.tasks.values())
+            self._sync_read_caches()
+
+            key = (status, limit)
+            cached = self._query_cache.get(key)
+            if cached is not None:
+                self._query_cache.move_to_end(key)
+                return cached
+
+            if status:
+                rows = self._conn.execute(
+                    "SELECT data FROM tasks WHERE status = ? "
+                    "ORDER BY created_at DESC LIMIT ?",
+                    (status, limit),
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT data FROM tasks ORDER BY created_at DESC LIMIT ?",
+                    (limit,),
+                ).fetchall()
+
+            tasks = [orjson.loads(row[0]) for row in rows]
+            self._query_cache[key] = tasks
+            if len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+            return tasks
 
     def delete_task(self, task_id: str):
         """
@@ -276,11 +463,13 @@ class TaskManager:
         Args:
             task_id: 任务ID
         """
-        with self._task_lock:
-            if task_id in self.tasks:
-                del self.tasks[task_id]
-                self._save_to_file()
-                logger.info(f"🗑️  任务已删除: {task_id}")
+        with self._transaction() as conn:
+            deleted = conn.execute(
+                "DELETE FROM tasks WHERE task_id = ?", (task_id,)
+            ).rowcount
+
+        if deleted:
+            logger.info(f"🗑️  任务已删除: {task_id}")
 
 
 # 全局单例实例
@@ -0,0 +1,64 @@
+"""
+角色录音声音克隆 (Celery 任务)
+
+创建角色时需要用 Golden Master Prompt 对降噪后的录音做一次声音克隆。
+克隆需要 IndexTTS2 模型和 GPU，与音频流水线一样在 Celery worker 中执行:
+- API 网关只负责投递任务并等待结果，不加载模型、不占用显存
+- worker 复用进程内共享的 AutoVoiceCloner (与流水线 Step 1 共用同一份模型)
+- 推理期间持有 GPU 信号量，与流水线互斥，防止显存溢出
+
+输入/输出音频通过共享文件系统传递 (与流水线的 data/tasks 目录相同)
+"""
+
+import os
+import logging
+from typing import Optional
+
+from app.celery_app import celery_app
+from app.services.gpu_semaphore import (
+    RedisSemaphore,
+    GPU_SEMAPHORE_KEY,
+    GPU_CONCURRENCY,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="voice_clone.clone_with_emotion_prompt", ignore_result=False)
+def clone_with_emotion_prompt(
+    input_audio: str, emo_audio: str, emo_text: str, output_dir: str
+) -> Optional[str]:
+    """
+    单条声音克隆 (情绪音频引导模式)
+
+    Args:
+        input_audio: 音色参考音频 (降噪后的录音)
+        emo_audio: 情感引导音频
+        emo_text: 情感引导文本
+        output_dir: 克隆音频输出目录
+
+    Returns:
+        克隆音频的绝对路径，克隆失败返回 None
+    """
+    # 按需导入: auto_voice_cloner 导入时会加载 IndexTTS2 (torch 等)
+    from scripts.auto_voice_cloner import get_voice_cloner
+
+    logger.info("🎙️ 开始角色声音克隆: %s", input_audio)
+    with RedisSemaphore(GPU_SEMAPHORE_KEY, limit=GPU_CONCURRENCY):
+        clone_result = get_voice_cloner().run_cloning(
+            input_audio=input_audio,
+            emo_audio=emo_audio,
+            emo_text=emo_text,
+            output_dir=output_dir,
+        )
+
+    results = clone_result.get("results") or [{}]
+    if clone_result.get("success", 0) > 0:
+        cloned_path = results[0].get("output_path")
+        if cloned_path and os.path.exists(cloned_path):
+            cloned_path = os.path.abspath(cloned_path)
+            logger.info("✅ 角色声音克隆成功: %s", cloned_path)
+            return cloned_path
+
+    logger.warning("⚠️ 角色声音克隆失败: %s", results[0].get("error", "未知错误"))
+    return None
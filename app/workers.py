@@ -0,0 +1,18 @@
+"""
+Gunicorn worker 类
+
+UvicornWorker 默认的 loop/http 为 "auto"，未安装 uvloop/httptools 时会静默退回
+asyncio + h11。这里显式指定 uvloop 和 httptools (由 uvicorn[standard] 安装)，
+依赖缺失时启动即报错，而不是悄悄降级。
+
+用法 (参见 scripts/serve.sh):
+    gunicorn app.main:app --worker-class app.workers.UvloopWorker
+"""
+
+from uvicorn.workers import UvicornWorker
+
+
+class UvloopWorker(UvicornWorker):
+    """使用 uvloop 事件循环和 httptools HTTP 解析器的 Uvicorn worker"""
+
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, "loop": "uvloop", "http": "httptools"}
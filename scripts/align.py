@@ -9,19 +9,30 @@ ABEA 核心对齐引擎 (align.py) - 纯粹绝对对齐版
 
 import os
 import sys
-import json
+import hashlib
 import logging
-from typing import List, Optional, Tuple
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
+from pathlib import Path
+
+import orjson
 
 try:
     import numpy as np
     from pydub import AudioSegment
-    from pydub.silence import detect_leading_silence
 except ImportError:
     print("错误：请先安装 pydub 和 numpy")
     sys.exit(1)
 
+try:
+    from scripts.audio_core import TTSFolderIndex
+    from scripts.audio_silence import detect_silence_edges
+except ImportError:
+    from audio_core import TTSFolderIndex
+    from audio_silence import detect_silence_edges
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -30,6 +41,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 并行加载音频的线程数
+LOAD_WORKERS = min(8, os.cpu_count() or 4)
+
+# 非 WAV 音频去除静音后的磁盘缓存目录
+# 按 (源文件路径, 修改时间, 文件大小, 静音阈值) 缓存，重复运行时跳过 ffmpeg 解码和裁剪；
+# 超过 TRIM_CACHE_MAX_BYTES 时按最近使用时间淘汰，也可以随时直接删除整个目录
+TRIM_CACHE_DIR = Path("data/trim_cache")
+
+# 裁剪缓存目录的容量上限 (字节)
+TRIM_CACHE_MAX_BYTES = 2 * 1024**3
+
 
 @dataclass
 class AudioClip:
@@ -49,13 +71,7 @@ def trim_silence(
     if len(audio) == 0:
         return audio
 
-    def detect_silence_end(audio_segment):
-        return detect_leading_silence(
-            audio_segment, silence_threshold=silence_thresh, chunk_size=chunk_size
-        )
-
-    start_trim = detect_silence_end(audio)
-    end_trim = detect_silence_end(audio.reverse())
+    start_trim, end_trim = detect_silence_edges(audio, silence_thresh, chunk_size)
 
     if start_trim + end_trim >= len(audio):
         return audio  # 全是静音，就不切了，或者返回空
@@ -63,17 +79,56 @@ def trim_silence(
     return audio[start_trim : len(audio) - end_trim]
 
 
-def search_audio_file(search_paths: List[str], filename: str) -> Optional[AudioSegment]:
+def index_search_paths(search_paths: List[str]) -> Dict[str, TTSFolderIndex]:
+    """扫描各搜索目录一次，建立文件名索引 (不存在的目录跳过)"""
+    return {
+        folder: TTSFolderIndex.scan(folder)
+        for folder in search_paths
+        if os.path.isdir(folder)
+    }
+
+
+def _find_in_folder(
+    folder: str, filename: str, indexes: Optional[Dict[str, TTSFolderIndex]]
+) -> Optional[str]:
+    """在目录中查找文件 (有索引时只查字典；没有索引或文件名带子目录时访问文件系统)"""
+    if indexes is not None and os.path.basename(filename) == filename:
+        index = indexes.get(folder)
+        return index.files.get(filename) if index is not None else None
+    file_path = os.path.join(folder, filename)
+    return file_path if os.path.exists(file_path) else None
+
+
+def find_audio_file(
+    search_paths: List[str],
+    filename: str,
+    indexes: Optional[Dict[str, TTSFolderIndex]] = None,
+) -> Optional[str]:
     for folder in search_paths:
-        file_path = os.path.join(folder, filename)
-        if os.path.exists(file_path):
-            return AudioSegment.from_file(file_path)
+        file_path = _find_in_folder(folder, filename, indexes)
+        if file_path is not None:
+            return file_path
     return None
 
 
-def search_audio_by_pattern(
-    search_paths: List[str], clip_id: int, text: str
+def search_audio_file(
+    search_paths: List[str],
+    filename: str,
+    indexes: Optional[Dict[str, TTSFolderIndex]] = None,
 ) -> Optional[AudioSegment]:
+    file_path = find_audio_file(search_paths, filename, indexes)
+    return AudioSegment.from_file(file_path) if file_path is not None else None
+
+
+def find_audio_by_pattern(
+    search_paths: List[str],
+    clip_id: int,
+    text: str,
+    indexes: Optional[Dict[str, TTSFolderIndex]] = None,
+) -> Optional[str]:
+    if indexes is None:
+        indexes = index_search_paths(search_paths)
+
     patterns = [
         f"{clip_id}-{text}.wav",
         f"{clip_id}-{text}.mp3",
@@ -83,26 +138,115 @@ def search_audio_by_pattern(
         f"{clip_id}.mp3",
     ]
     for folder in search_paths:
-        if not os.path.exists(folder):
+        index = indexes.get(folder)
+        if index is None:
             continue
         for pattern in patterns:
-            path = os.path.join(folder, pattern)
-            if os.path.exists(path):
-                return AudioSegment.from_file(path)
-        for f in os.listdir(folder):
-            if f.startswith(f"{clip_id}-") or f.startswith(f"{clip_id}_"):
-                path = os.path.join(folder, f)
-                return AudioSegment.from_file(path)
+            path = index.files.get(pattern)
+            if path is not None:
+                return path
+        # 以 "<ID>-" 或 "<ID>_" 开头的第一个文件
+        path = index.by_id.get(str(clip_id))
+        if path is not None:
+            return path
     return None
 
 
+def search_audio_by_pattern(
+    search_paths: List[str],
+    clip_id: int,
+    text: str,
+    indexes: Optional[Dict[str, TTSFolderIndex]] = None,
+) -> Optional[AudioSegment]:
+    file_path = find_audio_by_pattern(search_paths, clip_id, text, indexes)
+    return AudioSegment.from_file(file_path) if file_path is not None else None
+
+
+def load_trimmed_audio(file_path: str, silence_thresh: int = -40) -> AudioSegment:
+    """
+    加载音频并去除首尾静音
+
+    WAV 由 pydub 直接读取 (不调用 ffmpeg)，每次直接加载裁剪；
+    其他格式需要 ffmpeg 解码，裁剪结果以 WAV 缓存到 TRIM_CACHE_DIR
+    """
+    if file_path.lower().endswith(".wav"):
+        return trim_silence(AudioSegment.from_file(file_path), silence_thresh)
+
+    stat = os.stat(file_path)
+    key = hashlib.blake2b(
+        f"{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}|"
+        f"{silence_thresh}".encode(),
+        digest_size=16,
+    ).hexdigest()
+    cache_path = TRIM_CACHE_DIR / f"{key}.wav"
+    if cache_path.is_file():
+        try:
+            audio = AudioSegment.from_file(str(cache_path), format="wav")
+            # 更新修改时间，淘汰时按最近使用排序
+            os.utime(cache_path)
+            return audio
+        except Exception as e:
+            logger.warning("⚠️ 读取裁剪缓存失败，重新解码: %s: %s", cache_path, e)
+
+    audio = trim_silence(AudioSegment.from_file(file_path), silence_thresh)
+
+    # 先写临时文件再原子替换；写入失败时删除临时文件，不影响本次加载
+    tmp_path = None
+    try:
+        TRIM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=TRIM_CACHE_DIR, prefix=f".{key}-", suffix=".tmp"
+        )
+        with os.fdopen(fd, "wb") as f:
+            audio.export(f, format="wav")
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.debug("写入裁剪缓存失败: %s: %s", cache_path, e)
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+    else:
+        _prune_trim_cache()
+
+    return audio
+
+
+def _prune_trim_cache():
+    """裁剪缓存超过容量上限时，按最近使用时间删除最旧的缓存文件"""
+    try:
+        with os.scandir(TRIM_CACHE_DIR) as it:
+            entries = [
+                (entry.stat().st_mtime_ns, entry.stat().st_size, entry.path)
+                for entry in it
+                if entry.name.endswith(".wav") and entry.is_file()
+            ]
+    except OSError:
+        return
+
+    total = sum(size for _, size, _ in entries)
+    if total <= TRIM_CACHE_MAX_BYTES:
+        return
+
+    entries.sort()
+    for _, size, path in entries:
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
+        total -= size
+        if total <= TRIM_CACHE_MAX_BYTES:
+            break
+
+
 def load_config(config_path: str) -> List[AudioClip]:
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"文件不存在: {config_path}")
     clips = []
 
-    with open(config_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(config_path, "rb") as f:
+        data = orjson.loads(f.read())
 
     for item in data:
         # 读取精准的 source_start
@@ -123,29 +267,44 @@ def load_config(config_path: str) -> List[AudioClip]:
 
 
 def load_and_prep_audio(clips: List[AudioClip], search_paths: List[str]) -> bool:
-    """加载音频并做静音处理"""
+    """加载音频并做静音处理 (各片段互不依赖，用线程池并行解码和裁剪)"""
     logger.info(f"在以下路径搜索音频: {search_paths}")
     success = True
+    # 每个目录只扫描一次，各片段按索引查找文件
+    indexes = index_search_paths(search_paths)
 
-    for clip in clips:
-        audio = None
+    def load_one(clip: AudioClip) -> Optional[AudioSegment]:
+        file_path = None
         # 1. 文件名搜索
         if clip.filename:
-            audio = search_audio_file(search_paths, clip.filename)
-            if audio is None:
-                audio = search_audio_file(search_paths, os.path.basename(clip.filename))
+            file_path = find_audio_file(search_paths, clip.filename, indexes)
+            if file_path is None:
+                file_path = find_audio_file(
+                    search_paths, os.path.basename(clip.filename), indexes
+                )
 
         # 2. 模糊搜索
-        if audio is None:
-            audio = search_audio_by_pattern(search_paths, clip.id, clip.text)
+        if file_path is None:
+            file_path = find_audio_by_pattern(
+                search_paths, clip.id, clip.text, indexes
+            )
+
+        if file_path is None:
+            return None
+
+        # 3. 去除静音 (这是唯一允许的音频处理)
+        return load_trimmed_audio(file_path, silence_thresh=-40)
+
+    with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+        results = list(executor.map(load_one, clips))
 
+    for clip, audio in zip(clips, results):
         if audio is None:
             logger.error(f"❌ 缺失文件: ID={clip.id} {clip.text[:10]}")
             success = False
             continue
 
-        # 3. 去除静音 (这是唯一允许的音频处理)
-        clip.audio = trim_silence(audio, silence_thresh=-40)
+        clip.audio = audio
 
         # 4. 绝对定位：目标时间就是源时间
         clip.target_start = clip.source_start
@@ -153,6 +312,24 @@ def load_and_prep_audio(clips: List[AudioClip], search_paths: List[str]) -> bool
     return success
 
 
+# 采样位宽 -> numpy 整数类型
+_SAMPLE_DTYPES = {2: np.int16, 4: np.int32}
+
+
+def _to_samples(
+    audio: AudioSegment, frame_rate: int, channels: int, sample_width: int
+) -> np.ndarray:
+    """将音频转换为目标格式，返回 (帧数, 声道数) 的整数采样数组 (共享原始数据，不复制)"""
+    audio = (
+        audio.set_frame_rate(frame_rate)
+        .set_channels(channels)
+        .set_sample_width(sample_width)
+    )
+    return np.frombuffer(audio.raw_data, dtype=_SAMPLE_DTYPES[sample_width]).reshape(
+        -1, channels
+    )
+
+
 def render_output(clips: List[AudioClip], bgm_path: str, output_path: str) -> None:
     logger.info(f"导出目标: {output_path}")
 
@@ -170,13 +347,21 @@ def render_output(clips: List[AudioClip], bgm_path: str, output_path: str) -> No
     )
     total_dur = max(len(bgm), last_voice_end + 1000)
 
-    if len(bgm) < total_dur:
-        bgm += AudioSegment.silent(duration=total_dur - len(bgm))
-
-    final = bgm  # 直接在 BGM 上操作
-
-    # 3. 叠加人声 (Overlay)
-    voice_track = AudioSegment.silent(duration=total_dur)
+    # 统一输出格式 (与 pydub overlay 相同: 取最高采样率、最多声道、最大位宽)
+    segments = [bgm] + [c.audio for c in clips if c.audio]
+    frame_rate = max(seg.frame_rate for seg in segments)
+    channels = max(seg.channels for seg in segments)
+    sample_width = 4 if max(seg.sample_width for seg in segments) > 2 else 2
+    sample_info = np.iinfo(_SAMPLE_DTYPES[sample_width])
+
+    # 3. 叠加人声: 在单个宽位整数画布上累加 BGM 和人声，最后统一限幅，
+    # 避免 pydub overlay 每次叠加都复制整条音轨 (BGM 较短时画布尾部即为静音延展)
+    bgm_samples = _to_samples(bgm, frame_rate, channels, sample_width)
+    total_frames = max(len(bgm_samples), int(total_dur * frame_rate / 1000))
+    final = np.zeros(
+        (total_frames, channels), dtype=np.int32 if sample_width == 2 else np.int64
+    )
+    final[: len(bgm_samples)] = bgm_samples
 
     overlap_log = []
 
@@ -195,7 +380,10 @@ def render_output(clips: List[AudioClip], bgm_path: str, output_path: str) -> No
                     overlap_ms = prev_end - pos
                     overlap_log.append(f"ID {prev.id} 与 {clip.id} 重叠 {overlap_ms}ms")
 
-        voice_track = voice_track.overlay(clip.audio, position=max(0, pos))
+        samples = _to_samples(clip.audio, frame_rate, channels, sample_width)
+        start = max(0, pos) * frame_rate // 1000
+        end = min(start + len(samples), len(final))
+        final[start:end] += samples[: end - start]
 
     if overlap_log:
         logger.warning(f"⚠️  检测到 {len(overlap_log)} 处音频重叠 (已自然混合):")
@@ -204,11 +392,17 @@ def render_output(clips: List[AudioClip], bgm_path: str, output_path: str) -> No
         if len(overlap_log) > 5:
             logger.warning("  - ...")
 
-    # 4. 最终混音
-    final = final.overlay(voice_track)
+    # 4. 最终混音 (限幅到采样位宽范围)
+    np.clip(final, sample_info.min, sample_info.max, out=final)
+    output = AudioSegment(
+        final.astype(sample_info.dtype).tobytes(),
+        frame_rate=frame_rate,
+        sample_width=sample_width,
+        channels=channels,
+    )
 
     os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
-    final.export(output_path, format="wav")
+    output.export(output_path, format="wav")
     logger.info(f"✅ 输出成功: {output_path}")
 
 
@@ -10,29 +10,34 @@ import os
 import sys
 import json
 import logging
+import re
+import tempfile
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
-
-# 尝试导入 pandas，如果只用 JSON 其实可以不需要 pandas，但为了兼容性保留
-try:
-    import pandas as pd
-
-    HAS_PANDAS = True
-except ImportError:
-    HAS_PANDAS = False
+from typing import Dict, List, Optional, Tuple
 
 try:
     from pydub import AudioSegment
-    from pydub.silence import detect_leading_silence
 except ImportError:
     print("错误：请先安装 pydub 和 numpy")
     print("运行: pip install pydub numpy")
     sys.exit(1)
 
+try:
+    from scripts.audio_silence import detect_silence_edges
+except ImportError:
+    from audio_silence import detect_silence_edges
+
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 并行加载 TTS 音频的线程数
+LOAD_WORKERS = min(8, os.cpu_count() or 4)
+
+# TTS 文件名的 ID 前缀 ("<ID>-文本.wav" 或 "<ID>_文本.wav")
+_ID_PREFIX_RE = re.compile(r"([^-_]+)[-_]")
+
 
 # ============================================================================
 # 数据类定义
@@ -74,14 +79,7 @@ def trim_silence(
         Tuple[AudioSegment, float]: (裁剪后的音频, 节省的时长(秒))
     """
     original_duration = len(audio)
-
-    def detect_silence_end(audio_segment):
-        return detect_leading_silence(
-            audio_segment, silence_threshold=silence_thresh, chunk_size=chunk_size
-        )
-
-    start_trim = detect_silence_end(audio)
-    end_trim = detect_silence_end(audio.reverse())
+    start_trim, end_trim = detect_silence_edges(audio, silence_thresh, chunk_size)
 
     trimmed = audio[start_trim : original_duration - end_trim]
 
@@ -92,7 +90,32 @@ def trim_silence(
     return trimmed, saved_ms / 1000.0
 
 
-def load_tts_audio(tts_folder: str, clip_id: int, text: str) -> Optional[AudioSegment]:
+@dataclass
+class TTSFolderIndex:
+    """TTS 文件夹的文件名索引 (扫描一次目录，之后按片段查找都是字典查询)"""
+
+    files: Dict[str, str]  # 文件名 -> 路径
+    by_id: Dict[str, str]  # ID 前缀 -> 目录中第一个以 "<ID>-" 或 "<ID>_" 开头的文件路径
+
+    @classmethod
+    def scan(cls, tts_folder: str) -> "TTSFolderIndex":
+        files: Dict[str, str] = {}
+        by_id: Dict[str, str] = {}
+        with os.scandir(tts_folder) as entries:
+            for entry in entries:
+                files[entry.name] = entry.path
+                match = _ID_PREFIX_RE.match(entry.name)
+                if match:
+                    by_id.setdefault(match.group(1), entry.path)
+        return cls(files, by_id)
+
+
+def load_tts_audio(
+    tts_folder: str,
+    clip_id: int,
+    text: str,
+    index: Optional[TTSFolderIndex] = None,
+) -> Optional[AudioSegment]:
     """
     加载 TTS 音频文件（通过 ID 和文本自动匹配）
 
@@ -100,10 +123,14 @@ def load_tts_audio(tts_folder: str, clip_id: int, text: str) -> Optional[AudioSe
         tts_folder: TTS 音频文件夹路径
         clip_id: 片段 ID
         text: 片段文本
+        index: 文件夹索引 (批量加载时传入共享的索引，不传则扫描一次文件夹)
 
     Returns:
         Optional[AudioSegment]: 加载的音频，如果未找到则返回 None
     """
+    if index is None:
+        index = TTSFolderIndex.scan(tts_folder)
+
     patterns = [
         f"{clip_id}-{text}.wav",
         f"{clip_id}-{text}.mp3",
@@ -112,16 +139,15 @@ def load_tts_audio(tts_folder: str, clip_id: int, text: str) -> Optional[AudioSe
     ]
 
     for pattern in patterns:
-        file_path = os.path.join(tts_folder, pattern)
-        if os.path.exists(file_path):
+        file_path = index.files.get(pattern)
+        if file_path is not None:
             logger.info(f"加载 TTS 文件: {pattern}")
             return AudioSegment.from_file(file_path)
 
-    for file in os.listdir(tts_folder):
-        if file.startswith(f"{clip_id}-") or file.startswith(f"{clip_id}_"):
-            file_path = os.path.join(tts_folder, file)
-            logger.info(f"加载 TTS 文件: {file}")
-            return AudioSegment.from_file(file_path)
+    file_path = index.by_id.get(str(clip_id))
+    if file_path is not None:
+        logger.info(f"加载 TTS 文件: {os.path.basename(file_path)}")
+        return AudioSegment.from_file(file_path)
 
     return None
 
@@ -131,6 +157,62 @@ def load_tts_audio(tts_folder: str, clip_id: int, text: str) -> Optional[AudioSe
 # ============================================================================
 
 
+def _read_excel_rows(config_path: str) -> Tuple[List[str], List[dict]]:
+    """
+    读取 Excel 配置的列名和各行数据
+
+    openpyxl 解析 Excel 很慢，首次解析后在旁边生成 JSON 副本
+    (config.xlsx -> config.xlsx.json)，之后只要副本比 Excel 新，
+    就直接读取副本，不再导入 pandas 和解析 Excel
+
+    Returns:
+        Tuple[List[str], List[dict]]: (列名, 各行数据)
+    """
+    sidecar_path = f"{config_path}.json"
+    try:
+        if os.stat(sidecar_path).st_mtime_ns >= os.stat(config_path).st_mtime_ns:
+            with open(sidecar_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            return cached["columns"], cached["rows"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    # pandas 只在解析 Excel 时按需导入，只用 JSON 配置时不承担其导入开销
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError(
+            "读取Excel失败：未安装pandas或openpyxl。请运行 pip install pandas openpyxl"
+        )
+
+    df = pd.read_excel(config_path, engine="openpyxl")
+    columns = [str(column) for column in df.columns]
+    rows = df.rename(columns=str).to_dict(orient="records")
+
+    # 写入 JSON 副本 (先写临时文件再原子替换)；
+    # 无法序列化或写入失败时跳过并删除临时文件，不影响读取
+    tmp_path = None
+    try:
+        payload = json.dumps({"columns": columns, "rows": rows}, ensure_ascii=False)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(config_path)),
+            prefix=".config-",
+            suffix=".tmp",
+        )
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, sidecar_path)
+    except (TypeError, ValueError, OSError) as e:
+        logger.debug("写入Excel配置副本失败: %s: %s", sidecar_path, e)
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    return columns, rows
+
+
 def load_config(config_path: str) -> List[AudioClip]:
     """
     加载对齐配置文件（支持 JSON 和 Excel 格式）
@@ -173,16 +255,13 @@ def load_config(config_path: str) -> List[AudioClip]:
 
     # === 2. 处理 Excel 格式 (兼容旧代码) ===
     elif config_path.lower().endswith((".xlsx", ".xls")):
-        if not HAS_PANDAS:
-            raise ImportError(
-                "读取Excel失败：未安装pandas或openpyxl。请运行 pip install pandas openpyxl"
-            )
-
-        df = pd.read_excel(config_path, engine="openpyxl")
+        columns, rows = _read_excel_rows(config_path)
+        # 兼容 Excel 的中文列名 (列名对所有行相同，在循环外只判断一次)
+        has_legacy_columns = "源开始时间(秒)" in columns
+        has_filename = "文件名" in columns
 
-        for _, row in df.iterrows():
-            # 兼容 Excel 的中文列名
-            if "源开始时间(秒)" in df.columns:
+        for row in rows:
+            if has_legacy_columns:
                 src_start = float(row["源开始时间(秒)"])
                 src_end = float(row["源结束时间(秒)"])
                 clip_type = str(row["类型"]).upper().strip()
@@ -193,7 +272,7 @@ def load_config(config_path: str) -> List[AudioClip]:
                 clip_type = str(row.get("对齐类型", "FLOATING")).upper().strip()
                 text = str(row.get("文本", "")).strip()
 
-            filename = str(row.get("文件名", "")) if "文件名" in df.columns else ""
+            filename = str(row.get("文件名", "")) if has_filename else ""
 
             clip = AudioClip(
                 id=int(row["ID"]),
@@ -222,10 +301,41 @@ def load_config(config_path: str) -> List[AudioClip]:
 # ============================================================================
 
 
+def _load_clip_audio(
+    clip: AudioClip, tts_folder: str, index: TTSFolderIndex
+) -> Optional[AudioSegment]:
+    """查找并加载单个片段的 TTS 音频 (未找到返回 None)"""
+    # 优先使用文件名直接加载
+    if clip.filename:
+        # 文件名带子目录时才需要访问文件系统
+        if os.path.basename(clip.filename) == clip.filename:
+            file_path = index.files.get(clip.filename)
+        else:
+            file_path = os.path.join(tts_folder, clip.filename)
+            if not os.path.exists(file_path):
+                file_path = None
+        if file_path is not None:
+            logger.info(f"加载: {clip.filename}")
+            return AudioSegment.from_file(file_path)
+
+        # 如果文件名路径不对，尝试只用文件名在 tts_folder 下找
+        basename = os.path.basename(clip.filename)
+        file_path = index.files.get(basename)
+        if file_path is not None:
+            logger.info(f"加载(basename): {basename}")
+            return AudioSegment.from_file(file_path)
+
+    # 回退到旧的加载方式 (ID搜索)
+    return load_tts_audio(tts_folder, clip.id, clip.text, index)
+
+
 def load_all_tts(clips: List[AudioClip], tts_folder: str) -> bool:
     """
     加载所有 TTS 音频并去除静音
 
+    各片段互不依赖，解码 (ffmpeg 子进程) 和静音检测 (numpy) 都会释放 GIL，
+    因此用线程池并行加载
+
     Args:
         clips: 音频片段列表
         tts_folder: TTS 音频文件夹路径
@@ -236,37 +346,27 @@ def load_all_tts(clips: List[AudioClip], tts_folder: str) -> bool:
     logger.info(f"从 {tts_folder} 加载 TTS 音频...")
     success = True
     total_saved = 0.0
+    # 只扫描一次文件夹，各片段按索引查找文件
+    index = TTSFolderIndex.scan(tts_folder)
 
-    for clip in clips:
-        audio = None
-
-        # 优先使用文件名直接加载
-        if clip.filename:
-            file_path = os.path.join(tts_folder, clip.filename)
-            if os.path.exists(file_path):
-                logger.info(f"加载: {clip.filename}")
-                audio = AudioSegment.from_file(file_path)
-            else:
-                # 如果文件名路径不对，尝试只用文件名在 tts_folder 下找
-                basename = os.path.basename(clip.filename)
-                file_path = os.path.join(tts_folder, basename)
-                if os.path.exists(file_path):
-                    logger.info(f"加载(basename): {basename}")
-                    audio = AudioSegment.from_file(file_path)
-
-        # 回退到旧的加载方式 (ID搜索)
+    def load_one(clip: AudioClip) -> Optional[Tuple[AudioSegment, float, float]]:
+        audio = _load_clip_audio(clip, tts_folder, index)
         if audio is None:
-            audio = load_tts_audio(tts_folder, clip.id, clip.text)
+            return None
+        # 去除首尾静音
+        trimmed, saved = trim_silence(audio, silence_thresh=-40)
+        return trimmed, len(audio) / 1000.0, saved
 
-        if audio is None:
+    with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+        results = list(executor.map(load_one, clips))
+
+    for clip, result in zip(clips, results):
+        if result is None:
             logger.error(f"缺失文件: ID={clip.id}, 文本='{clip.text[:20]}...'")
             success = False
             continue
 
-        original_duration = len(audio) / 1000.0
-
-        # 去除首尾静音
-        trimmed, saved = trim_silence(audio, silence_thresh=-40)
+        trimmed, original_duration, saved = result
         clip.audio = trimmed
         clip.duration = len(trimmed) / 1000.0
         total_saved += saved
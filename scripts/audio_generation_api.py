@@ -4,13 +4,13 @@
 """
 
 import uuid
+import asyncio
 import logging
 import sys
 import os
-from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 
 # 添加项目根目录到路径
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -25,9 +25,9 @@ from app.models import (
     TaskListResponse,
     TaskStatus,
 )
-from app.services.task_manager import task_manager
-from app.services.audio_pipeline import generate_audio_pipeline
-from app.services.business_generate import business_generate_service
+from app.services.task_manager import task_manager, MAX_QUERY_LIMIT
+from app.services.audio_pipeline import submit_pipeline
+from app.services.business_generate import get_service
 
 # ============================================================================
 # 日志配置
@@ -36,17 +36,22 @@ from app.services.business_generate import business_generate_service
 logger = logging.getLogger(__name__)
 
 # ============================================================================
-# 线程池执行器
+# 创建路由器
 # ============================================================================
 
-# 线程池执行器 (用于后台任务)
-executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="audio_pipeline_")
+router = APIRouter(prefix="", tags=["音频生成"])
 
 # ============================================================================
-# 创建路由器
+# 辅助函数
 # ============================================================================
 
-router = APIRouter(prefix="", tags=["音频生成"])
+
+def _task_message(status: TaskStatus) -> str:
+    """任务创建响应消息"""
+    if status == TaskStatus.COMPLETED:
+        return "任务已完成 (复用相同输入的生成结果)"
+    return "任务已创建，正在后台执行"
+
 
 # ============================================================================
 # API 端点
@@ -58,7 +63,7 @@ async def create_generate_task(request: GenerateAudioRequest):
     """
     创建音频生成任务（基于路径）
 
-    接收请求参数，创建任务，在后台执行pipeline，立即返回task_id
+    接收请求参数，创建任务，将pipeline投递到Celery队列，立即返回task_id
 
     Args:
         request: 音频生成请求参数
@@ -71,7 +76,8 @@ async def create_generate_task(request: GenerateAudioRequest):
         task_id = str(uuid.uuid4())
 
         # 创建任务记录
-        task = task_manager.create_task(
+        task = await asyncio.to_thread(
+            task_manager.create_task,
             task_id=task_id,
             task_name=request.task_name,
             total_steps=4,
@@ -80,15 +86,15 @@ async def create_generate_task(request: GenerateAudioRequest):
         # 将请求参数转为字典
         params = request.model_dump()
 
-        # 提交到线程池后台执行
-        executor.submit(generate_audio_pipeline, task_id, params)
+        # 命中结果缓存时直接完成，否则投递到 Celery 队列 (文件哈希在线程中执行)
+        status = await asyncio.to_thread(submit_pipeline, task_id, params)
 
         logger.info(f"✅ 任务已提交: {task_id}")
 
         return TaskResponse(
             task_id=task_id,
-            status=TaskStatus.PENDING,
-            message="任务已创建，正在后台执行",
+            status=status,
+            message=_task_message(status),
             created_at=task["created_at"],
         )
 
@@ -117,9 +123,10 @@ async def create_generate_task_by_ids(request: GenerateByIdsRequest):
             f"user_id={request.user_id}, role_id={request.role_id}"
         )
 
-        # 1. 准备生成参数 (配置文件读取 + 数据库查询)
+        # 1. 准备生成参数 (配置文件读取 + 数据库查询，放到线程中执行以免阻塞事件循环)
         try:
-            params = business_generate_service.prepare_generation_params(
+            params = await asyncio.to_thread(
+                get_service().prepare_generation_params,
                 story_id=request.story_id,
                 user_id=request.user_id,
                 role_id=request.role_id,
@@ -136,21 +143,22 @@ async def create_generate_task_by_ids(request: GenerateByIdsRequest):
         task_id = str(uuid.uuid4())
 
         # 3. 创建任务记录
-        task = task_manager.create_task(
+        task = await asyncio.to_thread(
+            task_manager.create_task,
             task_id=task_id,
             task_name=params.get("task_name", f"故事{request.story_id}生成"),
             total_steps=4,
         )
 
-        # 4. 提交到线程池后台执行
-        executor.submit(generate_audio_pipeline, task_id, params)
+        # 4. 命中结果缓存时直接完成，否则投递到 Celery 队列
+        status = await asyncio.to_thread(submit_pipeline, task_id, params)
 
         logger.info(f"✅ ID生成任务已提交: {task_id}")
 
         return TaskResponse(
             task_id=task_id,
-            status=TaskStatus.PENDING,
-            message="任务已创建，正在后台执行",
+            status=status,
+            message=_task_message(status),
             created_at=task["created_at"],
         )
 
@@ -173,7 +181,7 @@ async def get_task_status(task_id: str):
     Returns:
         任务状态详情
     """
-    task = task_manager.get_task(task_id)
+    task = await asyncio.to_thread(task_manager.get_task, task_id)
 
     if task is None:
         raise HTTPException(status_code=404, detail=f"任务不存在: {task_id}")
@@ -188,31 +196,26 @@ async def get_task_status(task_id: str):
 
 @router.get("/api/tasks", response_model=TaskListResponse)
 async def list_all_tasks(
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_QUERY_LIMIT),
     status: Optional[str] = None,
 ):
     """
     列出所有任务
 
     Args:
-        limit: 返回数量限制
-        status: 按状态筛选 (可选)
+        limit: 返回数量限制 (1 ~ MAX_QUERY_LIMIT)
+        status: 按状态筛选 (可选，未知状态返回空列表)
 
     Returns:
         任务列表
     """
     try:
-        all_tasks = task_manager.get_all_tasks()
-
-        # 按状态筛选
-        if status:
-            all_tasks = [t for t in all_tasks if t.get("status") == status]
-
-        # 按创建时间倒序排序
-        all_tasks.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-
-        # 限制返回数量
-        all_tasks = all_tasks[:limit]
+        # 筛选、按创建时间倒序排序、截取均在存储层通过索引完成，无需在事件循环中排序
+        all_tasks = await asyncio.to_thread(
+            task_manager.query_tasks,
+            status=status,
+            limit=limit,
+        )
 
         # 转为 Pydantic 模型
         task_list = [TaskStatusResponse(**task) for task in all_tasks]
@@ -238,13 +241,13 @@ async def delete_task(task_id: str):
     Returns:
         删除结果
     """
-    task = task_manager.get_task(task_id)
+    task = await asyncio.to_thread(task_manager.get_task, task_id)
 
     if task is None:
         raise HTTPException(status_code=404, detail=f"任务不存在: {task_id}")
 
     try:
-        task_manager.delete_task(task_id)
+        await asyncio.to_thread(task_manager.delete_task, task_id)
         return {"message": f"任务已删除: {task_id}"}
     except Exception as e:
         logger.error(f"❌ 删除任务失败: {str(e)}")
@@ -259,5 +262,3 @@ async def delete_task(task_id: str):
 def shutdown_audio_generation():
     """关闭音频生成服务的资源"""
     logger.info("👋 音频生成服务正在关闭...")
-    executor.shutdown(wait=True)
-    logger.info("✅ 线程池已停止")
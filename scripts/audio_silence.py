@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+静音检测工具 (audio_silence.py)
+
+与 pydub.silence.detect_leading_silence 结果一致的向量化实现:
+pydub 按 chunk_size 毫秒逐块切片并计算 dBFS (纯 Python 循环)，检测结尾静音时还要先反转整段音频；
+这里用 numpy 一次性算出所有分块的 RMS，首尾静音同时得出，不复制音频数据。
+"""
+
+from typing import Tuple
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.silence import detect_leading_silence
+
+# 采样位宽 -> numpy 整数类型 (24 位没有对应类型，退回 pydub 实现)
+_SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+# 首次检测的分块数: 多数音频首尾静音很短，先只计算两端的一小段，找不到声音时再逐步扩大
+_INITIAL_WINDOW_CHUNKS = 64
+
+
+def _first_sound_chunk(
+    samples: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    min_dbfs: float,
+    max_amplitude: float,
+) -> int:
+    """
+    返回第一个非静音分块的序号 (全部静音时返回分块数)
+
+    Args:
+        samples: 交错排列的采样数组 (检测结尾时传入反转视图)
+        starts / ends: 各分块的起止采样下标 (整帧对齐；可能超出音频末尾，
+            超出部分按静音补齐，与 pydub 切片一致)
+    """
+    sample_total = len(samples)
+    chunk_count = len(starts)
+    # 8/16 位采样的平方可用 int32 表示，前缀和用 int64 累加，结果精确
+    if samples.itemsize <= 2:
+        square_dtype, sum_dtype = np.int32, np.int64
+    else:
+        square_dtype = sum_dtype = np.float64
+    window = _INITIAL_WINDOW_CHUNKS
+
+    while True:
+        n = min(window, chunk_count)
+        last = min(int(ends[n - 1]), sample_total)
+
+        # 采样能量的前缀和，分块能量 = 前缀和之差
+        cumulative = np.zeros(last + 1, dtype=sum_dtype)
+        np.cumsum(
+            np.square(samples[:last], dtype=square_dtype),
+            dtype=sum_dtype,
+            out=cumulative[1:],
+        )
+        energy = (
+            cumulative[np.minimum(ends[:n], last)]
+            - cumulative[np.minimum(starts[:n], last)]
+        )
+        sample_counts = ends[:n] - starts[:n]
+
+        # 与 audioop.rms 相同: 均方根取整，为 0 时 dBFS 为负无穷
+        rms = np.zeros(n)
+        valid = sample_counts > 0
+        rms[valid] = np.floor(np.sqrt(energy[valid] / sample_counts[valid]))
+        with np.errstate(divide="ignore"):
+            dbfs = 20 * np.log10(rms / max_amplitude)
+
+        sound = np.flatnonzero(dbfs >= min_dbfs)
+        if len(sound):
+            return int(sound[0])
+        if n == chunk_count:
+            return chunk_count
+        window *= 4
+
+
+def detect_silence_edges(
+    audio: AudioSegment, silence_thresh: float = -40, chunk_size: int = 10
+) -> Tuple[int, int]:
+    """
+    检测音频首尾的静音时长
+
+    结果与 detect_leading_silence(audio) 和 detect_leading_silence(audio.reverse()) 相同
+
+    Args:
+        audio: 音频
+        silence_thresh: 静音阈值 (dBFS)
+        chunk_size: 检测分块大小 (ms)
+
+    Returns:
+        (开头静音毫秒数, 结尾静音毫秒数)
+    """
+    duration_ms = len(audio)
+    if duration_ms == 0:
+        return 0, 0
+
+    dtype = _SAMPLE_DTYPES.get(audio.sample_width)
+    if dtype is None:
+        return (
+            detect_leading_silence(audio, silence_thresh, chunk_size),
+            detect_leading_silence(audio.reverse(), silence_thresh, chunk_size),
+        )
+
+    channels = audio.channels
+    samples = np.frombuffer(audio.raw_data, dtype=dtype)
+    samples = samples[: len(samples) - len(samples) % channels]
+
+    # 分块边界 (毫秒 -> 帧 -> 采样下标，帧的换算方式与 pydub 切片相同)
+    chunk_ms = np.arange(0, duration_ms, chunk_size)
+    frames_per_ms = audio.frame_rate / 1000.0
+    starts = (chunk_ms * frames_per_ms).astype(np.int64) * channels
+    ends = (
+        np.minimum(chunk_ms + chunk_size, duration_ms) * frames_per_ms
+    ).astype(np.int64) * channels
+
+    max_amplitude = audio.max_possible_amplitude
+    lead = _first_sound_chunk(samples, starts, ends, silence_thresh, max_amplitude)
+    # 结尾静音: 在反转视图上按相同分块检测 (等价于对反转音频检测开头，但不复制数据；
+    # 分块按整帧对齐，帧内声道顺序反转不影响能量)
+    trail = _first_sound_chunk(
+        samples[::-1], starts, ends, silence_thresh, max_amplitude
+    )
+
+    return (
+        min(lead * chunk_size, duration_ms),
+        min(trail * chunk_size, duration_ms),
+    )
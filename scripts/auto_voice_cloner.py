@@ -17,6 +17,7 @@ from typing import Optional, List, Dict
 from pathlib import Path
 import argparse
 import sys
+import threading
 from datetime import datetime
 
 # 添加项目根目录到路径
@@ -45,6 +46,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 日志分隔线
+_SEP = "=" * 70
+
 
 class AutoVoiceCloner:
     """
@@ -95,6 +99,8 @@ class AutoVoiceCloner:
         self.cloner = IndexTTS2VoiceCloner(
             cfg_path=cfg_path, model_dir=model_dir, auto_create_output_dir=True
         )
+        # 底层模型不是线程安全的，同一实例上的克隆任务串行执行
+        self._lock = threading.Lock()
         logger.info("✅ AutoVoiceCloner 初始化完成")
 
     def run_cloning(
@@ -104,6 +110,7 @@ class AutoVoiceCloner:
         emo_audio_folder: Optional[str] = None,
         emo_audio: Optional[str] = None,
         emo_text: Optional[str] = None,
+        output_dir: Optional[str] = None,
     ) -> Dict:
         """
         执行声音克隆任务（支持单条和批量两种模式）
@@ -126,6 +133,8 @@ class AutoVoiceCloner:
             emo_audio_folder (Optional[str]): 批量任务中，情感音频文件夹路径
             emo_audio (Optional[str]): 单条模式下的情感参考音频
             emo_text (Optional[str]): 单条模式下的目标文本
+            output_dir (Optional[str]): 本次任务的输出目录，默认使用初始化时的 output_dir
+                (便于多个任务复用同一个已加载模型的实例)
 
         Returns:
             Dict: 执行结果统计
@@ -141,25 +150,37 @@ class AutoVoiceCloner:
         if not os.path.exists(input_audio):
             raise FileNotFoundError(f"音色参考音频不存在: {input_audio}")
 
-        # 根据 batch_json_path 判断模式
-        if batch_json_path:
-            # 批量克隆模式
-            return self._run_batch_mode(
-                input_audio=input_audio,
-                batch_json_path=batch_json_path,
-                emo_audio_folder=emo_audio_folder,
-            )
+        if output_dir:
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
         else:
-            # 单条克隆模式
-            return self._run_single_mode(
-                input_audio=input_audio, emo_audio=emo_audio, emo_text=emo_text
-            )
+            output_dir = self.output_dir
+
+        with self._lock:
+            # 根据 batch_json_path 判断模式
+            if batch_json_path:
+                # 批量克隆模式
+                return self._run_batch_mode(
+                    input_audio=input_audio,
+                    batch_json_path=batch_json_path,
+                    emo_audio_folder=emo_audio_folder,
+                    output_dir=output_dir,
+                )
+            else:
+                # 单条克隆模式
+                return self._run_single_mode(
+                    input_audio=input_audio,
+                    emo_audio=emo_audio,
+                    emo_text=emo_text,
+                    output_dir=output_dir,
+                )
 
     def _run_batch_mode(
         self,
         input_audio: str,
         batch_json_path: str,
         emo_audio_folder: Optional[str] = None,
+        output_dir: Optional[Path] = None,
     ) -> Dict:
         """
         执行批量克隆模式
@@ -168,13 +189,13 @@ class AutoVoiceCloner:
             input_audio (str): 音色参考音频
             batch_json_path (str): JSON配置文件路径
             emo_audio_folder (Optional[str]): 情感音频文件夹路径
+            output_dir (Optional[Path]): 输出目录，默认使用 self.output_dir
 
         Returns:
             Dict: 执行结果
         """
-        logger.info("=" * 70)
-        logger.info("[批量克隆模式] 开始执行")
-        logger.info("=" * 70)
+        logger.info("%s\n[批量克隆模式] 开始执行\n%s", _SEP, _SEP)
+        output_dir = output_dir or self.output_dir
 
         # 验证参数
         if not os.path.exists(batch_json_path):
@@ -184,7 +205,7 @@ class AutoVoiceCloner:
             raise FileNotFoundError(f"情感音频文件夹不存在: {emo_audio_folder}")
 
         # 读取JSON配置
-        logger.info(f"读取配置文件: {batch_json_path}")
+        logger.info("读取配置文件: %s", batch_json_path)
         with open(batch_json_path, "r", encoding="utf-8") as f:
             tasks = json.load(f)
 
@@ -195,11 +216,14 @@ class AutoVoiceCloner:
         tasks_sorted = sorted(tasks, key=lambda x: int(x.get("sort", x.get("id", 0))))
         total_tasks = len(tasks_sorted)
 
-        logger.info(f"共加载 {total_tasks} 个任务")
-        logger.info(f"音色参考: {input_audio}")
-        if emo_audio_folder:
-            logger.info(f"情感音频文件夹: {emo_audio_folder}")
-        logger.info("=" * 70)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "共加载 %s 个任务\n音色参考: %s%s\n%s",
+                total_tasks,
+                input_audio,
+                f"\n情感音频文件夹: {emo_audio_folder}" if emo_audio_folder else "",
+                _SEP,
+            )
 
         # 执行批量克隆
         results = []
@@ -249,16 +273,20 @@ class AutoVoiceCloner:
 
                 # 构建输出文件名：{sort}_{text}.wav
                 output_filename = f"{sort_num}_{clean_text}.wav"
-                output_path = str(self.output_dir / output_filename)
-
-                # 显示进度
-                logger.info(f"[批量模式] 正在处理 {idx}/{total_tasks}...")
-                logger.info(f"  序号: {sort_num}")
-                logger.info(
-                    f"  文本: {text[:40]}..." if len(text) > 40 else f"  文本: {text}"
-                )
-                logger.info(f"  情感音频: {emo_filename}")
-                logger.info(f"  输出文件: {output_filename}")
+                output_path = str(output_dir / output_filename)
+
+                # 显示进度 (文本截断只在输出日志时计算)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "[批量模式] 正在处理 %s/%s...\n  序号: %s\n  文本: %s\n"
+                        "  情感音频: %s\n  输出文件: %s",
+                        idx,
+                        total_tasks,
+                        sort_num,
+                        f"{text[:40]}..." if len(text) > 40 else text,
+                        emo_filename,
+                        output_filename,
+                    )
 
                 # 执行克隆
                 result = self.cloner.clone_with_emotion_audio(
@@ -271,7 +299,7 @@ class AutoVoiceCloner:
 
                 if result.success:
                     success_count += 1
-                    logger.info(f"  ✅ 成功 ({result.duration_ms}ms)")
+                    logger.info("  ✅ 成功 (%sms)", result.duration_ms)
                     results.append(
                         {
                             "sort": sort_num,
@@ -283,7 +311,7 @@ class AutoVoiceCloner:
                     )
                 else:
                     failed_count += 1
-                    logger.error(f"  ❌ 失败: {result.error_message}")
+                    logger.error("  ❌ 失败: %s", result.error_message)
                     results.append(
                         {
                             "sort": sort_num,
@@ -301,13 +329,17 @@ class AutoVoiceCloner:
                 )
 
         # 输出统计信息
-        logger.info("=" * 70)
-        logger.info("[批量克隆模式] 执行完成")
-        logger.info(f"总任务数: {total_tasks}")
-        logger.info(f"成功: {success_count}")
-        logger.info(f"失败: {failed_count}")
-        logger.info(f"成功率: {success_count / total_tasks * 100:.1f}%")
-        logger.info("=" * 70)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "%s\n[批量克隆模式] 执行完成\n总任务数: %s\n成功: %s\n失败: %s\n"
+                "成功率: %.1f%%\n%s",
+                _SEP,
+                total_tasks,
+                success_count,
+                failed_count,
+                success_count / total_tasks * 100,
+                _SEP,
+            )
 
         return {
             "mode": "batch",
@@ -322,6 +354,7 @@ class AutoVoiceCloner:
         input_audio: str,
         emo_audio: Optional[str] = None,
         emo_text: Optional[str] = None,
+        output_dir: Optional[Path] = None,
     ) -> Dict:
         """
         执行单条克隆模式
@@ -330,13 +363,13 @@ class AutoVoiceCloner:
             input_audio (str): 音色参考音频
             emo_audio (Optional[str]): 情感参考音频
             emo_text (Optional[str]): 目标文本
+            output_dir (Optional[Path]): 输出目录，默认使用 self.output_dir
 
         Returns:
             Dict: 执行结果
         """
-        logger.info("=" * 70)
-        logger.info("[单条克隆模式] 开始执行")
-        logger.info("=" * 70)
+        logger.info("%s\n[单条克隆模式] 开始执行\n%s", _SEP, _SEP)
+        output_dir = output_dir or self.output_dir
 
         # 验证参数
         if not emo_audio:
@@ -350,13 +383,16 @@ class AutoVoiceCloner:
         # 构建输出文件名：使用时间戳命名
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_filename = f"{timestamp}.wav"
-        output_path = str(self.output_dir / output_filename)
-
-        logger.info(f"音色参考: {input_audio}")
-        logger.info(f"情感参考: {emo_audio}")
-        logger.info(f"目标文本: {emo_text}")
-        logger.info(f"输出文件: {output_filename}")
-        logger.info("=" * 70)
+        output_path = str(output_dir / output_filename)
+
+        logger.info(
+            "音色参考: %s\n情感参考: %s\n目标文本: %s\n输出文件: %s\n%s",
+            input_audio,
+            emo_audio,
+            emo_text,
+            output_filename,
+            _SEP,
+        )
 
         # 执行克隆
         result = self.cloner.clone_with_emotion_audio(
@@ -369,16 +405,20 @@ class AutoVoiceCloner:
 
         # 输出结果
         if result.success:
-            logger.info("=" * 70)
-            logger.info("[单条克隆模式] ✅ 执行成功")
-            logger.info(f"输出文件: {output_path}")
-            logger.info(f"耗时: {result.duration_ms}ms")
-            logger.info("=" * 70)
+            logger.info(
+                "%s\n[单条克隆模式] ✅ 执行成功\n输出文件: %s\n耗时: %sms\n%s",
+                _SEP,
+                output_path,
+                result.duration_ms,
+                _SEP,
+            )
         else:
-            logger.error("=" * 70)
-            logger.error("[单条克隆模式] ❌ 执行失败")
-            logger.error(f"错误信息: {result.error_message}")
-            logger.error("=" * 70)
+            logger.error(
+                "%s\n[单条克隆模式] ❌ 执行失败\n错误信息: %s\n%s",
+                _SEP,
+                result.error_message,
+                _SEP,
+            )
 
         return {
             "mode": "single",
@@ -433,6 +473,35 @@ class AutoVoiceCloner:
         return clean
 
 
+# ============================================================================
+# 共享实例 (模型只加载一次)
+# ============================================================================
+
+# 共享实例的默认输出目录
+DEFAULT_OUTPUT_DIR = project_root / "outputs"
+
+_shared_cloner: Optional[AutoVoiceCloner] = None
+_shared_cloner_lock = threading.Lock()
+
+
+def get_voice_cloner() -> AutoVoiceCloner:
+    """
+    获取进程内共享的 AutoVoiceCloner 实例 (首次调用时加载模型)
+
+    初始化会加载 TTS 模型，耗时长且占用大量显存，不应每个请求都创建；
+    各调用方通过 run_cloning(output_dir=...) 指定自己的输出目录
+
+    Returns:
+        AutoVoiceCloner: 共享实例
+    """
+    global _shared_cloner
+    if _shared_cloner is None:
+        with _shared_cloner_lock:
+            if _shared_cloner is None:
+                _shared_cloner = AutoVoiceCloner(output_dir=str(DEFAULT_OUTPUT_DIR))
+    return _shared_cloner
+
+
 # ============================================================================
 # API 调用函数 (用于 FastAPI 集成)
 # ============================================================================
@@ -467,14 +536,12 @@ def run_voice_cloning(
         FileNotFoundError: 当输入文件不存在时
         ValueError: 当参数无效时
     """
-    # 初始化克隆器
-    cloner = AutoVoiceCloner(output_dir=output_dir)
-
-    # 执行批量克隆
-    result = cloner.run_cloning(
+    # 执行批量克隆 (复用共享实例，避免每个任务重新加载模型)
+    result = get_voice_cloner().run_cloning(
         input_audio=input_wav,
         batch_json_path=json_db,
         emo_audio_folder=emo_audio_folder,
+        output_dir=output_dir,
     )
 
     # 提取所有成功生成的文件路径
@@ -2,12 +2,16 @@
 提供数据库配置加载和连接管理的基类
 """
 
-import yaml
 import pymysql
 import os
 import logging
+import threading
 from typing import Dict, Any
 
+from dbutils.pooled_db import PooledDB
+
+from scripts.config_loader import load_yaml_config
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -20,6 +24,14 @@ class BaseDAO:
     _db_config = None
     _config_path = None
 
+    # 类变量，进程内共享的数据库连接池 (首次获取连接时创建)
+    _pool = None
+    _pool_lock = threading.Lock()
+
+    # 连接池参数: 常驻空闲连接数 / 最大连接数
+    POOL_MAX_CACHED = 10
+    POOL_MAX_CONNECTIONS = 30
+
     def __init__(self, config_path="config/database.yaml"):
         """
         初始化基础DAO
@@ -42,6 +54,7 @@ class BaseDAO:
             logger.info("加载新的数据库配置")
             BaseDAO._config_path = config_path
             BaseDAO._db_config = self._load_db_config()
+            BaseDAO._pool = None  # 配置变化后重新创建连接池
         else:
             logger.info("使用缓存的数据库配置")
 
@@ -69,31 +82,48 @@ class BaseDAO:
             logger.debug(f"使用指定配置路径: {config_path}")
 
         logger.info(f"读取配置文件: {config_path}")
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f)
+        config = load_yaml_config(config_path)
         logger.info("数据库配置加载完成")
         return config["mysql"]
 
+    def _get_pool(self) -> PooledDB:
+        """
+        获取进程内共享的数据库连接池
+
+        Returns:
+            PooledDB: 数据库连接池
+        """
+        if BaseDAO._pool is None:
+            with BaseDAO._pool_lock:
+                if BaseDAO._pool is None:
+                    logger.info("创建数据库连接池")
+                    logger.debug(f"连接参数: host={self.db_config['host']}, port={self.db_config['port']}, user={self.db_config['user']}, database={self.db_config['database']}")
+                    BaseDAO._pool = PooledDB(
+                        creator=pymysql,
+                        maxcached=self.POOL_MAX_CACHED,
+                        maxconnections=self.POOL_MAX_CONNECTIONS,
+                        blocking=True,  # 连接数达到上限时等待，而不是报错
+                        ping=1,  # 取出连接时检查连接是否可用
+                        host=self.db_config["host"],
+                        port=self.db_config["port"],
+                        user=self.db_config["user"],
+                        password=self.db_config["password"],
+                        database=self.db_config["database"],
+                        charset=self.db_config["charset"],
+                    )
+        return BaseDAO._pool
+
     def _get_db_connection(self):
         """
         获取数据库连接
 
+        连接来自连接池，调用 close() 时归还连接池而不是真正断开，
+        避免每次查询都重新建立 TCP 连接和认证
+
         Returns:
-            pymysql.Connection: 数据库连接对象
+            数据库连接对象 (接口与 pymysql.Connection 一致)
         """
-        logger.info("创建数据库连接")
-        logger.debug(f"连接参数: host={self.db_config['host']}, port={self.db_config['port']}, user={self.db_config['user']}, database={self.db_config['database']}")
-        
-        connection = pymysql.connect(
-            host=self.db_config["host"],
-            port=self.db_config["port"],
-            user=self.db_config["user"],
-            password=self.db_config["password"],
-            database=self.db_config["database"],
-            charset=self.db_config["charset"],
-        )
-        logger.info("数据库连接创建成功")
-        return connection
+        return self._get_pool().connection()
 
 
 # 示例用法
@@ -2,15 +2,16 @@
 
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Tuple
+import asyncio
 import os
 import logging
+import pymysql
 from scripts.character_dao import CharacterDAO
 from scripts.user_input_audio_dao import UserInputAudioDAO
 from scripts.file_dao import FileDAO
 from scripts.auth_api import get_current_user
 from scripts.audio_processor import process_audio_with_deepfilternet_denoiser
-from scripts.auto_voice_cloner import AutoVoiceCloner
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,10 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 OUTPUTS_DIR = os.path.join(project_root, "outputs")
 # Golden Master Prompt 音频路径
 GOLDEN_MASTER_PROMPT = os.path.join(project_root, "prompt", "golden_master_prompt.MP3")
+# Golden Master Prompt 是随项目发布的固定文件，启动时检查一次即可
+GOLDEN_MASTER_PROMPT_EXISTS = os.path.isfile(GOLDEN_MASTER_PROMPT)
+if not GOLDEN_MASTER_PROMPT_EXISTS:
+    logger.error("Golden Master Prompt 文件不存在: %s，声音克隆将降级为使用降噪音频", GOLDEN_MASTER_PROMPT)
 router = APIRouter(prefix="/api/characters", tags=["角色管理"])
 
 # 确保输出目录存在
@@ -30,6 +35,10 @@ character_dao = CharacterDAO()
 user_input_audio_dao = UserInputAudioDAO()
 file_dao = FileDAO()
 
+# 保存录音记录时可恢复的错误 (fileId 非法 / 文件读写失败 / 数据库错误)，
+# 不影响角色创建；其他异常 (程序错误) 直接向上抛出
+SAVE_AUDIO_ERRORS = (ValueError, OSError, pymysql.MySQLError)
+
 
 class CharacterRequest(BaseModel):
     """创建角色请求"""
@@ -55,6 +64,188 @@ class CharacterAudioResponse(BaseModel):
     init_input: Optional[str] = None
 
 
+# Golden Master Prompt 的情感引导文本
+GOLDEN_MASTER_EMO_TEXT = "小朋友们大家好，这是一段黄金母本的音频，这段音频的主要目的呀，是为后续的所有音频克隆提供一段完美的音频输入"
+
+# 等待 worker 完成声音克隆的最长时间 (秒)，超时降级为使用降噪音频
+CLONE_TIMEOUT_SECONDS = 300
+# 轮询克隆任务状态的间隔 (秒)
+CLONE_POLL_INTERVAL = 0.5
+
+
+# ==================== 录音处理 (降噪 + 声音克隆) ====================
+
+
+def _denoise_audio(init_input: str) -> Optional[str]:
+    """
+    步骤1: 使用 DeepFilterNet -> Denoiser 处理音频
+
+    Returns:
+        降噪后音频的绝对路径，失败返回 None
+    """
+    logger.info("步骤1: 开始降噪处理音频: %s", init_input)
+    try:
+        denoised_audio = process_audio_with_deepfilternet_denoiser(
+            input_path=init_input,
+            device=None,  # 自动选择设备
+        )
+        if denoised_audio:
+            # 确保路径是绝对路径
+            denoised_audio = os.path.abspath(denoised_audio)
+            logger.info("音频降噪成功: %s", denoised_audio)
+            return denoised_audio
+        logger.warning("音频降噪失败，跳过后续克隆步骤")
+    except Exception as e:
+        logger.error("音频降噪异常: %s", e)
+    return None
+
+
+def _submit_golden_master_clone(denoised_audio: str):
+    """投递声音克隆任务到 Celery 队列 (连接 Redis，应在线程中调用)"""
+    # 按需导入: 只有真正需要克隆时才连接任务队列，API 进程启动不依赖 Celery
+    from app.services.voice_clone import clone_with_emotion_prompt
+
+    return clone_with_emotion_prompt.apply_async(
+        kwargs={
+            "input_audio": denoised_audio,  # 纯净人声音频作为音色参考
+            "emo_audio": GOLDEN_MASTER_PROMPT,  # Golden Master Prompt 作为情感引导
+            "emo_text": GOLDEN_MASTER_EMO_TEXT,  # 默认文本
+            "output_dir": OUTPUTS_DIR,
+        },
+        # 超时后不再等待结果，届时 worker 尚未开始执行的任务直接丢弃
+        expires=CLONE_TIMEOUT_SECONDS,
+    )
+
+
+async def _clone_with_golden_master(denoised_audio: str) -> str:
+    """
+    步骤2: 使用降噪后的音频进行声音克隆（情绪音频引导模式）
+
+    克隆需要 GPU 推理，投递到 Celery worker 执行 (见 app.services.voice_clone)，
+    这里只轮询任务状态，API 进程不加载模型
+
+    Returns:
+        克隆音频的绝对路径，克隆失败或超时时降级为降噪音频
+    """
+    logger.info("步骤2: 开始声音克隆，input_audio=%s", denoised_audio)
+    try:
+        async_result = await asyncio.to_thread(_submit_golden_master_clone, denoised_audio)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + CLONE_TIMEOUT_SECONDS
+        while not await asyncio.to_thread(async_result.ready):
+            if loop.time() >= deadline:
+                logger.warning("声音克隆超时，使用降噪音频作为 clean_input")
+                return denoised_audio
+            await asyncio.sleep(CLONE_POLL_INTERVAL)
+
+        if not async_result.successful():
+            logger.error("声音克隆异常: %s，使用降噪音频作为 clean_input", async_result.result)
+            return denoised_audio
+        cloned_path = async_result.result
+    except Exception as e:
+        logger.error("声音克隆异常: %s，使用降噪音频作为 clean_input", e)
+        return denoised_audio
+
+    if cloned_path and os.path.exists(cloned_path):
+        logger.info("声音克隆成功: %s", cloned_path)
+        return cloned_path
+
+    logger.warning("声音克隆失败，使用降噪音频作为 clean_input")
+    return denoised_audio
+
+
+async def _generate_clean_input(init_input: str) -> Optional[str]:
+    """
+    由原始录音生成 clean_input (降噪 + 声音克隆)
+
+    降噪是阻塞操作，放到线程中执行；声音克隆在 Celery worker 中执行，这里异步等待结果
+
+    Returns:
+        clean_input 音频路径，降噪失败返回 None
+    """
+    denoised_audio = await asyncio.to_thread(_denoise_audio, init_input)
+
+    if not (denoised_audio and os.path.exists(denoised_audio)):
+        logger.warning("降噪音频不可用，clean_input 将为 None")
+        return None
+
+    # Golden Master Prompt 不存在时 (启动时已检查) 无需克隆，降级为使用降噪音频
+    if not GOLDEN_MASTER_PROMPT_EXISTS:
+        return denoised_audio
+
+    return await _clone_with_golden_master(denoised_audio)
+
+
+def _find_file_record(file_id_str: Optional[str]) -> Tuple[Optional[int], Optional[dict]]:
+    """
+    查询录音文件记录
+
+    Returns:
+        (file_id, 文件记录)；未提供 fileId、fileId 非法或查询失败时文件记录为 None
+    """
+    if not file_id_str:
+        return None, None
+    try:
+        file_id = int(file_id_str)
+        return file_id, file_dao.find_by_id(file_id)
+    except SAVE_AUDIO_ERRORS as e:
+        logger.warning("保存录音到user_input_audio表失败: %s", e)
+        return None, None
+
+
+def _resolve_init_input(file_id: int, file_record: dict) -> str:
+    """根据文件记录构建录音文件的绝对路径"""
+    # 获取文件名（应该已经是wav格式，因为上传时已转换）
+    file_name = file_record.get("file_name", "")
+
+    # 如果文件名为空或不是wav格式，尝试从file_url提取
+    if not file_name or not file_name.endswith(".wav"):
+        file_url = file_record.get("file_url", "")
+        if file_url:
+            # 从URL中提取文件名
+            file_name = os.path.basename(file_url)
+        else:
+            # 如果都没有，使用file_id生成文件名
+            file_name = f"{file_id}.wav"
+
+    # 确保文件名是wav格式
+    if not file_name.endswith(".wav"):
+        file_name = f"{os.path.splitext(file_name)[0]}.wav"
+
+    # 构建完整的文件路径（存储在outputs目录下，与audio_tts.py保持一致）
+    # 使用绝对路径，确保音频处理脚本能找到文件
+    return os.path.abspath(os.path.join(OUTPUTS_DIR, file_name))
+
+
+def _save_input_audio(
+    user_id: int,
+    role_id: int,
+    file_id: int,
+    init_input: str,
+    clean_input: Optional[str],
+):
+    """保存录音到user_input_audio表 (失败只记录日志，不影响角色创建)"""
+    try:
+        # clean_input 可能为 None，后续可以异步更新
+        user_input_audio_dao.insert(
+            user_id=user_id,
+            role_id=role_id,
+            init_input=init_input,
+            clean_input=clean_input,
+        )
+        logger.info(
+            "已保存录音到user_input_audio表: user_id=%s, role_id=%s, file_id=%s, file_path=%s, clean_input=%s",
+            user_id,
+            role_id,
+            file_id,
+            init_input,
+            clean_input,
+        )
+    except SAVE_AUDIO_ERRORS as e:
+        logger.warning("保存录音到user_input_audio表失败: %s", e)
+
+
 @router.post("", response_model=CharacterResponse)
 async def create_character(
     request: CharacterRequest, current_user: dict = Depends(get_current_user)
@@ -62,133 +253,42 @@ async def create_character(
     """创建角色"""
     try:
         user_id = current_user["user_id"]
-        role_id = character_dao.insert(role_name=request.name, user_id=user_id)
+
+        # 数据库操作在线程中执行；创建角色与查询录音文件记录互不依赖，并行执行
+        role_id, (file_id, file_record) = await asyncio.gather(
+            asyncio.to_thread(
+                character_dao.insert, role_name=request.name, user_id=user_id
+            ),
+            asyncio.to_thread(_find_file_record, request.fileId),
+        )
+
+        db_calls = [asyncio.to_thread(character_dao.find_by_id, role_id)]
 
         # 如果提供了fileId，保存到user_input_audio表
-        if request.fileId:
-            try:
-                file_id = int(request.fileId)
-                file_record = file_dao.find_by_id(file_id)
-                if file_record:
-                    # 获取文件名（应该已经是wav格式，因为上传时已转换）
-                    file_name = file_record.get("file_name", "")
-
-                    # 如果文件名为空或不是wav格式，尝试从file_url提取
-                    if not file_name or not file_name.endswith(".wav"):
-                        file_url = file_record.get("file_url", "")
-                        if file_url:
-                            # 从URL中提取文件名
-                            file_name = os.path.basename(file_url)
-                        else:
-                            # 如果都没有，使用file_id生成文件名
-                            file_name = f"{file_id}.wav"
-
-                    # 确保文件名是wav格式
-                    if not file_name.endswith(".wav"):
-                        file_name = f"{os.path.splitext(file_name)[0]}.wav"
-
-                    # 构建完整的文件路径（存储在outputs目录下，与audio_tts.py保持一致）
-                    # 使用绝对路径，确保音频处理脚本能找到文件
-                    init_input = os.path.join(OUTPUTS_DIR, file_name)
-                    init_input = os.path.abspath(init_input)
-
-                    # 验证文件是否存在
-                    if not os.path.exists(init_input):
-                        logger.warning(
-                            f"音频文件不存在: {init_input}，但仍保存记录到数据库"
-                        )
-                        clean_input = None
-                    else:
-                        # 步骤1: 使用 DeepFilterNet -> Denoiser 处理音频
-                        logger.info(f"步骤1: 开始降噪处理音频: {init_input}")
-                        denoised_audio = None
-                        try:
-                            denoised_audio = process_audio_with_deepfilternet_denoiser(
-                                input_path=init_input,
-                                device=None,  # 自动选择设备
-                            )
-                            if denoised_audio:
-                                # 确保路径是绝对路径
-                                denoised_audio = os.path.abspath(denoised_audio)
-                                logger.info(f"音频降噪成功: {denoised_audio}")
-                            else:
-                                logger.warning("音频降噪失败，跳过后续克隆步骤")
-                        except Exception as e:
-                            logger.error(f"音频降噪异常: {str(e)}")
-                            denoised_audio = None
-
-                        # 步骤2: 使用降噪后的音频进行声音克隆（情绪音频引导模式）
-                        clean_input = None
-                        if denoised_audio and os.path.exists(denoised_audio):
-                            logger.info(
-                                f"步骤2: 开始声音克隆，input_audio={denoised_audio}"
-                            )
-                            try:
-                                # 验证 Golden Master Prompt 文件是否存在
-                                if not os.path.exists(GOLDEN_MASTER_PROMPT):
-                                    logger.error(
-                                        f"Golden Master Prompt 文件不存在: {GOLDEN_MASTER_PROMPT}"
-                                    )
-                                    clean_input = denoised_audio  # 降级为使用降噪音频
-                                else:
-                                    # 初始化 AutoVoiceCloner
-                                    voice_cloner = AutoVoiceCloner(
-                                        output_dir=OUTPUTS_DIR
-                                    )
-
-                                    # 执行单条克隆（使用情绪音频引导模式）
-                                    clone_result = voice_cloner.run_cloning(
-                                        input_audio=denoised_audio,  # 纯净人声音频作为音色参考
-                                        emo_audio=GOLDEN_MASTER_PROMPT,  # Golden Master Prompt 作为情感引导
-                                        emo_text="小朋友们大家好，这是一段黄金母本的音频，这段音频的主要目的呀，是为后续的所有音频克隆提供一段完美的音频输入",  # 默认文本
-                                    )
-
-                                    # 检查克隆是否成功
-                                    if clone_result.get(
-                                        "success"
-                                    ) > 0 and clone_result.get("results"):
-                                        cloned_path = clone_result["results"][0].get(
-                                            "output_path"
-                                        )
-                                        if cloned_path and os.path.exists(cloned_path):
-                                            clean_input = os.path.abspath(cloned_path)
-                                            logger.info(f"声音克隆成功: {clean_input}")
-                                        else:
-                                            logger.warning(
-                                                "声音克隆失败，使用降噪音频作为 clean_input"
-                                            )
-                                            clean_input = denoised_audio
-                                    else:
-                                        error_msg = clone_result.get("results", [{}])[
-                                            0
-                                        ].get("error", "未知错误")
-                                        logger.warning(
-                                            f"声音克隆失败: {error_msg}，使用降噪音频作为 clean_input"
-                                        )
-                                        clean_input = denoised_audio
-                            except Exception as e:
-                                logger.error(
-                                    f"声音克隆异常: {str(e)}，使用降噪音频作为 clean_input"
-                                )
-                                clean_input = denoised_audio
-                        else:
-                            logger.warning("降噪音频不可用，clean_input 将为 None")
-                            clean_input = None
-
-                    # 先插入记录（clean_input 可能为 None，后续可以异步更新）
-                    user_input_audio_dao.insert(
-                        user_id=user_id,
-                        role_id=role_id,
-                        init_input=init_input,
-                        clean_input=clean_input,
-                    )
-                    logger.info(
-                        f"已保存录音到user_input_audio表: user_id={user_id}, role_id={role_id}, file_id={file_id}, file_path={init_input}, clean_input={clean_input}"
-                    )
-            except (ValueError, Exception) as e:
-                logger.warning(f"保存录音到user_input_audio表失败: {str(e)}")
-                # 即使保存失败，也不影响角色创建
-        role = character_dao.find_by_id(role_id)
+        if file_record:
+            init_input = _resolve_init_input(file_id, file_record)
+
+            # 验证文件是否存在
+            if not os.path.exists(init_input):
+                logger.warning("音频文件不存在: %s，但仍保存记录到数据库", init_input)
+                clean_input = None
+            else:
+                # 降噪与声音克隆 (在线程中执行，不阻塞事件循环)
+                clean_input = await _generate_clean_input(init_input)
+
+            # 保存录音记录与查询角色信息互不依赖，并行执行
+            db_calls.append(
+                asyncio.to_thread(
+                    _save_input_audio,
+                    user_id,
+                    role_id,
+                    file_id,
+                    init_input,
+                    clean_input,
+                )
+            )
+
+        role, *_ = await asyncio.gather(*db_calls)
         if not role:
             raise HTTPException(status_code=500, detail="角色创建失败")
 
@@ -202,7 +302,7 @@ async def create_character(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"创建角色失败: {str(e)}")
+        logger.error("创建角色失败: %s", e)
         raise HTTPException(status_code=500, detail=f"创建角色失败: {str(e)}")
 
 
@@ -224,7 +324,7 @@ async def get_user_characters(current_user: dict = Depends(get_current_user)):
             for char in characters
         ]
     except Exception as e:
-        logger.error(f"获取角色列表失败: {str(e)}")
+        logger.error("获取角色列表失败: %s", e)
         raise HTTPException(status_code=500, detail=f"获取角色列表失败: {str(e)}")
 
 
@@ -260,5 +360,5 @@ async def get_character_audio(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"获取角色音频路径失败: {str(e)}")
+        logger.error("获取角色音频路径失败: %s", e)
         raise HTTPException(status_code=500, detail=f"获取角色音频路径失败: {str(e)}")
@@ -0,0 +1,145 @@
+"""配置文件加载工具
+
+解析后的 YAML / JSON 配置按 (文件路径, 修改时间, 文件大小) 缓存:
+- 文件未变化时直接返回缓存的解析结果，不再重复读取和解析
+- 文件被修改后修改时间或大小变化，自动重新解析 (支持热更新)
+- 使用 LRU 淘汰，缓存条目数有上限
+
+YAML 解析较慢，首次解析后会把结果保存为 JSON 副本，后续 (包括其他进程和重启后)
+读取内容相同的 YAML 时直接读取副本:
+- 副本按 YAML 内容的哈希命名，内容变化后自然失效，不依赖修改时间
+- 副本保存在仅当前用户可访问的缓存目录 (CONFIG_CACHE_DIR) 中，
+  不会把配置 (如数据库密码) 以明文副本的形式放到配置目录旁边
+
+返回的是共享的缓存对象，调用方不应修改。
+"""
+
+import os
+import hashlib
+import logging
+import tempfile
+from functools import lru_cache
+from typing import Any
+
+import orjson
+import yaml
+
+# 优先使用 libyaml C 扩展的解析器，未安装时退回纯 Python 实现
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+logger = logging.getLogger(__name__)
+
+# 最多缓存的配置文件 (版本) 数
+CONFIG_CACHE_SIZE = 128
+
+# YAML 解析结果的 JSON 副本目录 (权限 0700，副本文件权限 0600)，可通过环境变量覆盖
+CONFIG_CACHE_DIR = os.getenv(
+    "CONFIG_CACHE_DIR",
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "config_cache"
+    ),
+)
+
+
+def _write_json_sidecar(sidecar_path: str, config: Any):
+    """
+    写入 YAML 的 JSON 副本 (先写临时文件再原子替换)
+
+    只有 JSON 能无损表示的配置才写副本 (例如包含日期等类型时跳过)；
+    临时文件由 mkstemp 以 0600 权限创建；写入失败 (如目录只读) 不影响配置读取
+    """
+    try:
+        data = orjson.dumps(config)
+    except TypeError:
+        return
+    if orjson.loads(data) != config:
+        return
+
+    tmp_path = None
+    try:
+        os.makedirs(CONFIG_CACHE_DIR, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=CONFIG_CACHE_DIR, prefix=".config-", suffix=".tmp"
+        )
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, sidecar_path)
+    except OSError as e:
+        logger.debug(f"写入JSON配置副本失败: {sidecar_path}: {e}")
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+@lru_cache(maxsize=CONFIG_CACHE_SIZE)
+def _load_yaml_cached(path: str, mtime_ns: int, size: int) -> Any:
+    """解析 YAML 文件，优先读取内容相同的 JSON 副本 (mtime_ns / size 仅作为缓存键)"""
+    with open(path, "rb") as f:
+        content = f.read()
+
+    # 副本按 YAML 内容命名: 内容不变则副本有效，与修改时间无关
+    digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+    sidecar_path = os.path.join(CONFIG_CACHE_DIR, f"{digest}.json")
+    try:
+        with open(sidecar_path, "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        pass
+
+    logger.debug(f"解析YAML配置文件: {path}")
+    # 以字节解析，由 libyaml 直接识别编码 (默认 UTF-8)，省去文本解码层
+    config = yaml.load(content, Loader=_SafeLoader)
+
+    _write_json_sidecar(sidecar_path, config)
+    return config
+
+
+@lru_cache(maxsize=CONFIG_CACHE_SIZE)
+def _load_json_cached(path: str, mtime_ns: int, size: int) -> Any:
+    """解析 JSON 文件 (mtime_ns / size 仅作为缓存键)"""
+    logger.debug(f"解析JSON配置文件: {path}")
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def load_yaml_config(path) -> Any:
+    """
+    读取 YAML 配置文件 (按修改时间和文件大小缓存)
+
+    Args:
+        path: 配置文件路径
+
+    Returns:
+        解析后的配置 (共享的缓存对象，调用方不应修改)
+
+    Raises:
+        FileNotFoundError: 配置文件不存在
+        yaml.YAMLError: 配置文件格式错误
+    """
+    path = os.fspath(path)
+    st = os.stat(path)
+    return _load_yaml_cached(path, st.st_mtime_ns, st.st_size)
+
+
+def load_json_config(path) -> Any:
+    """
+    读取 JSON 配置文件 (按修改时间和文件大小缓存)
+
+    Args:
+        path: 配置文件路径
+
+    Returns:
+        解析后的配置 (共享的缓存对象，调用方不应修改)
+
+    Raises:
+        FileNotFoundError: 配置文件不存在
+        orjson.JSONDecodeError: 配置文件格式错误
+    """
+    path = os.fspath(path)
+    st = os.stat(path)
+    return _load_json_cached(path, st.st_mtime_ns, st.st_size)
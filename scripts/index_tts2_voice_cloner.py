@@ -232,14 +232,15 @@ class IndexTTS2VoiceCloner:
                 verbose=params.verbose,
             )
 
-            # 验证输出文件是否生成
-            if not os.path.exists(params.output_path):
+            # 验证输出文件是否生成 (一次 stat 同时获取文件大小)
+            try:
+                file_size = os.stat(params.output_path).st_size
+            except OSError:
                 raise RuntimeError(
                     f"模型推理完成，但未生成输出文件: {params.output_path}"
                 )
 
             # 验证文件大小（防止生成空文件）
-            file_size = os.path.getsize(params.output_path)
             if file_size < 100:  # 小于100字节认为是无效文件
                 raise RuntimeError(f"生成的音频文件过小 ({file_size} bytes)，可能无效")
 
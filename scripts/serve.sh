@@ -0,0 +1,24 @@
+#!/bin/bash
+# 生产环境启动脚本: Gunicorn + Uvicorn worker (多进程)
+# 用法: bash scripts/serve.sh
+#
+# 可通过环境变量覆盖:
+#   WORKERS  worker 进程数 (默认 2*CPU+1)
+#   HOST     监听地址 (默认 0.0.0.0)
+#   PORT     监听端口 (默认 8000)
+#
+# worker 使用 uvloop + httptools (app/workers.py)
+# 任务状态保存在 data/tasks.db (SQLite)，所有 worker 进程共享
+
+set -e
+
+cd "$(dirname "$0")/.."
+
+WORKERS=${WORKERS:-$((2 * $(nproc) + 1))}
+
+exec gunicorn app.main:app \
+    --workers "$WORKERS" \
+    --worker-class app.workers.UvloopWorker \
+    --worker-connections 1000 \
+    --timeout 120 \
+    --bind "${HOST:-0.0.0.0}:${PORT:-8000}"
@@ -1,10 +1,10 @@
 """故事数据访问对象"""
 
 import os
-import yaml
 import pymysql
 from typing import List, Dict, Any, Optional
 from scripts.base_dao import BaseDAO
+from scripts.config_loader import load_yaml_config
 import logging
 
 logger = logging.getLogger(__name__)
@@ -104,8 +104,7 @@ class StoryDAO(BaseDAO):
 
         # 重新加载配置文件
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
+            config = load_yaml_config(config_path)
 
             # 提取映射关系
             mapping = config.get("story_path_mapping", {})
@@ -0,0 +1,138 @@
+"""
+静音检测 (audio_silence.detect_silence_edges) 测试脚本
+
+与 pydub.silence.detect_leading_silence 的结果逐一对比:
+随机音频 + 边界情况 (全静音 / 短于一个分块 / 恰好落在分块边界)
+"""
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.silence import detect_leading_silence
+
+try:
+    from scripts.audio_silence import detect_silence_edges
+except ImportError:
+    from audio_silence import detect_silence_edges
+
+# 采样位宽 -> numpy 整数类型
+SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+def make_segment(samples: np.ndarray, frame_rate: int, sample_width: int) -> AudioSegment:
+    """由 (帧数, 声道数) 的浮点数组构建 AudioSegment (按位宽截断)"""
+    dtype = SAMPLE_DTYPES[sample_width]
+    info = np.iinfo(dtype)
+    data = np.clip(samples, info.min, info.max).astype(dtype)
+    return AudioSegment(
+        data.tobytes(),
+        frame_rate=frame_rate,
+        sample_width=sample_width,
+        channels=samples.shape[1],
+    )
+
+
+def assert_matches_pydub(segment: AudioSegment, silence_thresh: float = -40, chunk_size: int = 10):
+    """检测结果应与 pydub 对开头 / 反转后音频的检测结果一致"""
+    expected = (
+        detect_leading_silence(segment, silence_thresh, chunk_size),
+        detect_leading_silence(segment.reverse(), silence_thresh, chunk_size),
+    )
+    actual = detect_silence_edges(segment, silence_thresh, chunk_size)
+    assert actual == expected, (
+        f"结果与 pydub 不一致: {actual} != {expected} "
+        f"(frames={int(segment.frame_count())}, channels={segment.channels}, "
+        f"width={segment.sample_width}, thresh={silence_thresh}, chunk={chunk_size})"
+    )
+
+
+def test_random_clips():
+    """
+    场景1: 随机音频 (不同采样率 / 声道 / 位宽 / 阈值 / 分块大小，首尾带静音)
+    """
+    print("\n" + "=" * 60)
+    print("场景1: 随机音频")
+    print("=" * 60)
+
+    rng = np.random.default_rng(0)
+    cases = 0
+    for frame_rate in (8000, 16000, 44100):
+        for channels in (1, 2):
+            for sample_width in (1, 2, 4):
+                amplitude = np.iinfo(SAMPLE_DTYPES[sample_width]).max / 4
+                for _ in range(5):
+                    frames = int(rng.integers(0, 2000)) * frame_rate // 1000 + int(rng.integers(0, 50))
+                    samples = rng.standard_normal((frames, channels)) * amplitude * rng.uniform(0.001, 1)
+                    lead = int(rng.integers(0, frames + 1))
+                    tail = int(rng.integers(0, frames + 1))
+                    samples[:lead] *= rng.choice([0, 0.005, 0.02])
+                    samples[frames - tail:] *= rng.choice([0, 0.005, 0.02])
+
+                    segment = make_segment(samples, frame_rate, sample_width)
+                    assert_matches_pydub(
+                        segment,
+                        silence_thresh=float(rng.choice([-30, -40, -50])),
+                        chunk_size=int(rng.choice([1, 7, 10, 25])),
+                    )
+                    cases += 1
+
+    print(f"✅ 场景1测试通过 ({cases} 条音频)")
+
+
+def test_edge_cases():
+    """
+    场景2: 边界情况
+    """
+    print("\n" + "=" * 60)
+    print("场景2: 边界情况")
+    print("=" * 60)
+
+    frame_rate = 16000
+    chunk_frames = frame_rate * 10 // 1000  # 10ms 分块的帧数
+    rng = np.random.default_rng(1)
+
+    def loud(frames, channels=1):
+        return rng.standard_normal((frames, channels)) * 8000
+
+    def silent(frames, channels=1):
+        return np.zeros((frames, channels))
+
+    cases = {
+        "空音频": silent(0),
+        "全静音": silent(frame_rate),
+        "全静音 (双声道)": silent(frame_rate, 2),
+        "短于一个分块 (有声)": loud(chunk_frames // 2),
+        "短于一个分块 (静音)": silent(chunk_frames // 2),
+        "全部有声": loud(frame_rate),
+        "恰好整数个分块": np.concatenate([silent(3 * chunk_frames), loud(5 * chunk_frames), silent(2 * chunk_frames)]),
+        "整数个分块多一帧": np.concatenate([silent(3 * chunk_frames), loud(5 * chunk_frames), silent(2 * chunk_frames + 1)]),
+        "整数个分块少一帧": np.concatenate([silent(3 * chunk_frames - 1), loud(5 * chunk_frames), silent(2 * chunk_frames)]),
+        "声音只在最后一帧": np.concatenate([silent(4 * chunk_frames), loud(1)]),
+        "声音只在第一帧": np.concatenate([loud(1), silent(4 * chunk_frames)]),
+    }
+
+    for name, samples in cases.items():
+        for sample_width in (1, 2, 4):
+            scale = np.iinfo(SAMPLE_DTYPES[sample_width]).max / np.iinfo(np.int16).max
+            segment = make_segment(samples * scale, frame_rate, sample_width)
+            assert_matches_pydub(segment)
+        print(f"  ✓ {name}")
+
+    print("✅ 场景2测试通过")
+
+
+def run_all_tests():
+    """
+    运行所有测试场景
+    """
+    print("\n" + "=" * 60)
+    print("detect_silence_edges 测试套件")
+    print("=" * 60)
+
+    test_random_clips()
+    test_edge_cases()
+
+    print("\n🎉 所有测试通过！")
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,174 @@
+"""
+结果缓存 (app.services.result_cache) 测试脚本
+
+验证缓存键随输入文件 / 文件夹内容变化，以及结果保存的硬链接降级逻辑
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from app.services import result_cache
+
+
+def _write(path: Path, data: bytes):
+    """写入文件，并把修改时间推后，确保与上一次写入的 mtime 不同"""
+    path.write_bytes(data)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def _make_params(root: Path) -> dict:
+    """创建输入文件和文件夹，返回生成参数"""
+    emo_dir = root / "emo"
+    emo_dir.mkdir()
+    _write(emo_dir / "happy.wav", b"happy")
+    _write(root / "input.wav", b"voice")
+    _write(root / "db.json", b"[]")
+    return {
+        "input_wav": str(root / "input.wav"),
+        "json_db": str(root / "db.json"),
+        "emo_audio_folder": str(emo_dir),
+        "task_name": "不影响缓存键",
+    }
+
+
+def test_key_changes_with_file_content():
+    """
+    场景1: 输入文件内容变化后缓存键变化，恢复原内容后缓存键恢复
+    """
+    print("\n" + "=" * 60)
+    print("场景1: 输入文件内容变化")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        params = _make_params(Path(tmp))
+        key = result_cache.compute_cache_key(params)
+        assert key is not None, "输入文件可读时应返回缓存键"
+        assert result_cache.compute_cache_key(dict(params, task_name="其他")) == key, \
+            "task_name 不影响生成结果，不应改变缓存键"
+
+        _write(Path(params["input_wav"]), b"another voice")
+        changed = result_cache.compute_cache_key(params)
+        assert changed != key, "输入音频内容变化后缓存键应变化"
+
+        _write(Path(params["input_wav"]), b"voice")
+        assert result_cache.compute_cache_key(params) == key, "内容恢复后缓存键应恢复"
+
+    print("✅ 场景1测试通过")
+
+
+def test_key_changes_with_folder_content():
+    """
+    场景2: 文件夹中的音频新增或修改后缓存键变化
+    """
+    print("\n" + "=" * 60)
+    print("场景2: 文件夹内容变化")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        params = _make_params(Path(tmp))
+        emo_dir = Path(params["emo_audio_folder"])
+        key = result_cache.compute_cache_key(params)
+
+        _write(emo_dir / "sad.wav", b"sad")
+        added = result_cache.compute_cache_key(params)
+        assert added != key, "文件夹新增音频后缓存键应变化"
+
+        _write(emo_dir / "happy.wav", b"happier")
+        modified = result_cache.compute_cache_key(params)
+        assert modified not in (key, added), "文件夹中的音频修改后缓存键应变化"
+
+    print("✅ 场景2测试通过")
+
+
+def test_key_stable_across_atomic_replace():
+    """
+    场景3: 以相同内容原子替换输入文件 (写临时文件再重命名) 后缓存键不变
+    """
+    print("\n" + "=" * 60)
+    print("场景3: 相同内容重命名替换")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        params = _make_params(Path(tmp))
+        key = result_cache.compute_cache_key(params)
+
+        # 新文件的 inode 和 mtime 都不同，哈希缓存失效后按内容重新计算
+        tmp_file = Path(tmp) / "input.wav.tmp"
+        _write(tmp_file, b"voice")
+        os.replace(tmp_file, params["input_wav"])
+
+        assert result_cache.compute_cache_key(params) == key, "内容相同时缓存键不应变化"
+
+        os.remove(params["json_db"])
+        assert result_cache.compute_cache_key(params) is None, "输入文件不存在时应跳过缓存"
+
+    print("✅ 场景3测试通过")
+
+
+def test_store_output_falls_back_to_copy():
+    """
+    场景4: 无法创建硬链接 (如跨文件系统) 时复制文件，缓存结果可正常读取
+    """
+    print("\n" + "=" * 60)
+    print("场景4: 硬链接失败时复制")
+    print("=" * 60)
+
+    original_root = result_cache.CACHE_ROOT
+    original_link = os.link
+
+    def failing_link(src, dst):
+        raise OSError(18, "Invalid cross-device link")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result_cache.CACHE_ROOT = Path(tmp) / "tasks"
+        final_output = Path(tmp) / "final.wav"
+        _write(final_output, b"final audio")
+        try:
+            # 硬链接: 与原文件共享 inode
+            result_cache.store_output("linked", final_output)
+            linked = result_cache.get_cached_output("linked")
+            assert linked is not None and os.path.samefile(linked, final_output), \
+                "可以硬链接时缓存文件应与原文件共享 inode"
+
+            # 复制: 内容相同，但是独立文件
+            os.link = failing_link
+            result_cache.store_output("copied", final_output)
+            copied = result_cache.get_cached_output("copied")
+            assert copied is not None, "降级复制后应命中缓存"
+            assert not os.path.samefile(copied, final_output), "降级时应复制文件"
+            assert copied.read_bytes() == b"final audio", "复制的内容应与原文件一致"
+            assert not list(copied.parent.glob("*.tmp")), "不应残留临时文件"
+            assert result_cache.get_cached_output("missing") is None, "未缓存的键不应命中"
+        finally:
+            os.link = original_link
+            result_cache.CACHE_ROOT = original_root
+
+    print("✅ 场景4测试通过")
+
+
+def run_all_tests():
+    """
+    运行所有测试场景
+    """
+    print("\n" + "=" * 60)
+    print("ResultCache 测试套件")
+    print("=" * 60)
+
+    test_key_changes_with_file_content()
+    test_key_changes_with_folder_content()
+    test_key_stable_across_atomic_replace()
+    test_store_output_falls_back_to_copy()
+
+    print("\n🎉 所有测试通过！")
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,238 @@
+"""
+任务管理器 (app.services.task_manager) 测试脚本
+
+多个 TaskManager 共享同一个 tasks.db (模拟多个 API worker / Celery worker):
+- 一个实例的写入对另一个实例的查询立即可见 (包括其他进程的写入)
+- 没有实际变化的更新不写入、不使读缓存失效
+- 进入终态的更新同步刷盘
+- 旧版 tasks.json 重复导入是安全的
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import orjson
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+
+@contextmanager
+def temp_workdir():
+    """切换到临时工作目录 (TaskManager 使用相对路径 data/tasks.db)"""
+    old_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(old_cwd)
+
+
+def new_manager():
+    """创建独立的 TaskManager 实例 (绕过单例，模拟另一个进程中的实例)"""
+    # 在临时工作目录中导入，模块级单例不会在项目目录下创建数据库
+    from app.services.task_manager import TaskManager
+
+    manager = object.__new__(TaskManager)
+    manager.__init__()
+    return manager
+
+
+class RecordingConnection:
+    """记录执行的 SQL 语句的连接代理"""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.statements = []
+
+    def execute(self, sql, *args):
+        self.statements.append(sql)
+        return self._conn.execute(sql, *args)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def test_writes_visible_across_instances():
+    """
+    场景1: 一个实例的写入对另一个实例可见 (查询缓存随 data_version 失效)
+    """
+    print("\n" + "=" * 60)
+    print("场景1: 跨实例 / 跨进程可见")
+    print("=" * 60)
+
+    from app.models import TaskStatus
+
+    with temp_workdir() as tmp:
+        api, worker = new_manager(), new_manager()
+
+        # 先查询一次，让 api 实例缓存空结果
+        assert api.query_tasks() == [], "初始应没有任务"
+
+        api.create_task("t1", task_name="任务1")
+        assert [t["task_id"] for t in worker.query_tasks()] == ["t1"], "worker 应看到新任务"
+
+        worker.update_task("t1", status=TaskStatus.PROCESSING, progress="Step 1/4")
+        processing = api.query_tasks(status="processing")
+        assert [t["task_id"] for t in processing] == ["t1"], "api 的缓存应在 worker 写入后失效"
+        assert api.get_task("t1")["progress"] == "Step 1/4", "单任务查询应读到最新进度"
+        assert orjson.loads(api.get_task_json("t1"))["status"] == "processing"
+
+        # 其他进程的写入
+        code = (
+            "from app.services.task_manager import task_manager\n"
+            "task_manager.create_task('t2', task_name='子进程任务')\n"
+        )
+        env = dict(os.environ, PYTHONPATH=project_root)
+        subprocess.run([sys.executable, "-c", code], cwd=tmp, env=env, check=True)
+
+        ids = [t["task_id"] for t in api.query_tasks()]
+        assert ids == ["t2", "t1"], f"应按创建时间倒序看到子进程创建的任务: {ids}"
+        assert api.query_tasks(status="unknown") == [], "未知状态应返回空列表"
+
+    print("✅ 场景1测试通过")
+
+
+def test_noop_update_skips_write():
+    """
+    场景2: 没有实际变化的更新不写入，读缓存保持有效
+    """
+    print("\n" + "=" * 60)
+    print("场景2: 无变化的更新")
+    print("=" * 60)
+
+    from app.models import TaskStatus
+
+    with temp_workdir():
+        manager = new_manager()
+        manager.create_task("t1")
+        manager.update_task("t1", status=TaskStatus.PROCESSING, progress="Step 1/4")
+
+        before = manager.get_task("t1")
+        cached = manager.query_tasks()
+        write_version = manager._write_version
+
+        manager.update_task("t1", status=TaskStatus.PROCESSING, progress="Step 1/4")
+
+        assert manager.get_task("t1") == before, "无变化的更新不应修改任务 (包括 updated_at)"
+        assert manager._write_version == write_version, "无变化的更新不应计为写入"
+        assert manager.query_tasks() is cached, "无变化的更新不应使查询缓存失效"
+
+        manager.update_task("t1", progress="Step 2/4")
+        assert manager.query_tasks() is not cached, "实际写入后查询缓存应失效"
+        assert manager.get_task("t1")["progress"] == "Step 2/4"
+
+    print("✅ 场景2测试通过")
+
+
+def test_terminal_update_is_durable():
+    """
+    场景3: 进入终态的更新在 synchronous=FULL 下提交，之后恢复 NORMAL
+    """
+    print("\n" + "=" * 60)
+    print("场景3: 终态同步刷盘")
+    print("=" * 60)
+
+    from app.models import TaskStatus
+
+    with temp_workdir():
+        manager = new_manager()
+        manager.create_task("t1")
+        recorder = RecordingConnection(manager._conn)
+        manager._conn = recorder
+
+        manager.update_task("t1", status=TaskStatus.PROCESSING)
+        assert "PRAGMA synchronous=FULL" not in recorder.statements, "进度更新不应同步刷盘"
+
+        recorder.statements.clear()
+        manager.update_task("t1", status=TaskStatus.COMPLETED, output_wav="out.wav")
+        statements = recorder.statements
+        assert "PRAGMA synchronous=FULL" in statements, "终态更新应同步刷盘"
+        assert statements.index("PRAGMA synchronous=FULL") < statements.index("BEGIN IMMEDIATE")
+        assert statements[-1] == "PRAGMA synchronous=NORMAL", "提交后应恢复 NORMAL"
+
+        # 1 = NORMAL
+        assert manager._conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+        task = manager.get_task("t1")
+        assert task["status"] == "completed" and task["completed_at"], "终态应记录完成时间"
+
+    print("✅ 场景3测试通过")
+
+
+def test_legacy_migration_is_idempotent():
+    """
+    场景4: 旧版 tasks.json 导入后改名；文件再次出现时重复导入不覆盖已有任务
+    """
+    print("\n" + "=" * 60)
+    print("场景4: 重复导入 tasks.json")
+    print("=" * 60)
+
+    def legacy_task(task_id, status, progress):
+        return {
+            "task_id": task_id,
+            "task_name": None,
+            "status": status,
+            "progress": progress,
+            "current_step": 0,
+            "total_steps": 4,
+            "steps": [],
+            "created_at": f"2024-01-01T00:00:0{task_id[-1]}",
+            "updated_at": f"2024-01-01T00:00:0{task_id[-1]}",
+        }
+
+    with temp_workdir():
+        os.makedirs("data", exist_ok=True)
+        with open("data/tasks.json", "wb") as f:
+            f.write(orjson.dumps({"old1": legacy_task("old1", "completed", "旧任务")}))
+
+        first = new_manager()
+        assert not os.path.exists("data/tasks.json"), "导入后 tasks.json 应改名"
+        assert os.path.exists("data/tasks.json.migrated")
+        assert [t["task_id"] for t in first.query_tasks()] == ["old1"]
+
+        first.update_task("old1", progress="导入后修改")
+
+        # 例如从备份恢复了 tasks.json
+        with open("data/tasks.json", "wb") as f:
+            f.write(
+                orjson.dumps(
+                    {
+                        "old1": legacy_task("old1", "completed", "旧任务"),
+                        "old2": legacy_task("old2", "failed", "另一个旧任务"),
+                    }
+                )
+            )
+
+        second = new_manager()
+        tasks = {t["task_id"]: t for t in second.query_tasks()}
+        assert sorted(tasks) == ["old1", "old2"], f"重复导入不应产生重复任务: {sorted(tasks)}"
+        assert tasks["old1"]["progress"] == "导入后修改", "重复导入不应覆盖已有任务"
+        assert not os.path.exists("data/tasks.json"), "再次导入后 tasks.json 应改名"
+
+    print("✅ 场景4测试通过")
+
+
+def run_all_tests():
+    """
+    运行所有测试场景
+    """
+    print("\n" + "=" * 60)
+    print("TaskManager 测试套件")
+    print("=" * 60)
+
+    test_writes_visible_across_instances()
+    test_noop_update_skips_write()
+    test_terminal_update_is_durable()
+    test_legacy_migration_is_idempotent()
+
+    print("\n🎉 所有测试通过！")
+
+
+if __name__ == "__main__":
+    run_all_tests()
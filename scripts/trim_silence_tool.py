@@ -21,12 +21,16 @@ from tqdm import tqdm
 
 try:
     from pydub import AudioSegment
-    from pydub.silence import detect_leading_silence
 except ImportError:
     print("错误：请先安装 pydub")
     print("运行: pip install pydub")
     sys.exit(1)
 
+try:
+    from scripts.audio_silence import detect_silence_edges
+except ImportError:
+    from audio_silence import detect_silence_edges
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO, format="%(message)s", handlers=[logging.StreamHandler()]
@@ -41,16 +45,8 @@ def trim_silence(audio: AudioSegment, silence_thresh: int = -40, chunk_size: int
     if len(audio) == 0:
         return audio, 0
 
-    def detect_silence_end(audio_segment):
-        return detect_leading_silence(
-            audio_segment, silence_threshold=silence_thresh, chunk_size=chunk_size
-        )
-
-    # 检测开头静音
-    start_trim = detect_silence_end(audio)
-
-    # 检测结尾静音 (反转音频后检测开头)
-    end_trim = detect_silence_end(audio.reverse())
+    # 一次检测首尾静音 (结尾无需反转音频)
+    start_trim, end_trim = detect_silence_edges(audio, silence_thresh, chunk_size)
 
     original_duration = len(audio)
 
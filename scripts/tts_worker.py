@@ -108,12 +108,10 @@ class LocalTTSWrapper:
                 verbose=False,
             )
 
-            if (
-                os.path.exists(output_wav_path)
-                and os.path.getsize(output_wav_path) > 100
-            ):
-                return True
-            else:
+            # 输出文件存在且大于100字节视为成功 (一次 stat 完成两项检查)
+            try:
+                return os.stat(output_wav_path).st_size > 100
+            except OSError:
                 return False
 
         except Exception as e:
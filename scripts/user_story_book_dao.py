@@ -2,7 +2,7 @@
 
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urljoin
 
 import pymysql
@@ -62,6 +62,24 @@ class UserStoryBookDAO(BaseDAO):
         finally:
             conn.close()
 
+    def insert_many(self, records: List[Tuple[int, int, int, str]]) -> int:
+        """批量插入用户有声故事书记录 (user_id, role_id, story_id, story_book_path)，一次往返写入"""
+        rows = [
+            (user_id, role_id, story_id, self._build_public_path(story_book_path))
+            for user_id, role_id, story_id, story_book_path in records
+        ]
+
+        conn = self._get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                sql = """INSERT INTO user_story_books (user_id, role_id, story_id, story_book_path)
+                         VALUES (%s, %s, %s, %s)"""
+                cursor.executemany(sql, rows)
+                conn.commit()
+                return cursor.rowcount
+        finally:
+            conn.close()
+
     def normalize_path(self, story_book_path: str) -> str:
         """对外暴露的路径规范化辅助方法，便于其他调用方复用。"""
         return self._build_public_path(story_book_path)